@@ -119,5 +119,195 @@ DatabaseGroup = [
              "test scenario, Trove will create 3 VMs for testing, In some"
              "testing environment such as zuul, This will"
              "cause the test to failed due to the lack of memory."
-    )
+    ),
+    cfg.IntOpt(
+        'dataset_size',
+        default=1,
+        min=0,
+        max=51200,
+        help='Size in MB of the deterministic dataset loaded before creating '
+             'backups and replicas. It is verified with checksums on the '
+             'restored instances and the replicas. The instance volumes are '
+             'sized for the dataset, 0 disables the dataset.'
+    ),
+    cfg.IntOpt(
+        'database_ready_timeout',
+        default=120,
+        help='Timeout in seconds to wait for the database port of an instance '
+             'to accept connections after the instance becomes HEALTHY.'
+    ),
+    cfg.BoolOpt(
+        'run_workload',
+        default=False,
+        help='Whether to run a background read/write workload against the '
+             'instance during instance actions such as resize, rebuild, '
+             'restart and upgrade. The throughput and latencies are attached '
+             'to the test result.'
+    ),
+    cfg.IntOpt(
+        'workload_connections',
+        default=4,
+        min=1,
+        help='Number of connections used by the background workload.'
+    ),
+    cfg.IntOpt(
+        'workload_qps',
+        default=50,
+        min=0,
+        help='Target queries per second of the background workload, 0 means '
+             'no limit.'
+    ),
+    cfg.FloatOpt(
+        'workload_write_ratio',
+        default=0.2,
+        min=0,
+        max=1,
+        help='Fraction of write queries in the background workload.'
+    ),
+    cfg.BoolOpt(
+        'run_availability_probe',
+        default=False,
+        help='Whether to measure the database downtime during instance '
+             'operations, e.g. restart, resize, rebuild, upgrade, promote, '
+             'enabling SSL, attaching configuration and updating access. '
+             'The unavailability windows are attached to the test result.'
+    ),
+    cfg.IntOpt(
+        'availability_probe_interval',
+        default=100,
+        min=10,
+        help='Interval in milliseconds between two availability probes.'
+    ),
+    cfg.DictOpt(
+        'downtime_budgets',
+        default={},
+        help='Maximum downtime in seconds allowed per operation, e.g. '
+             'restart:30,resize-flavor:120. Operations not listed are only '
+             'measured.'
+    ),
+    cfg.IntOpt(
+        'ssl_key_pool_size',
+        default=6,
+        min=0,
+        help='Number of private keys for the SSL test certificates generated '
+             'ahead of time in a background process, 0 to generate them '
+             'when needed.'
+    ),
+    cfg.BoolOpt(
+        'reuse_test_ca',
+        default=False,
+        help='Whether to sign the SSL test certificates with CAs generated '
+             'once per test run instead of a new CA for every certificate.'
+    ),
+    cfg.StrOpt(
+        'ssl_cert_cache_dir',
+        help='Directory where the SSL test certificates are cached between '
+             'test runs. Certificates are generated for every run if not '
+             'set.'
+    ),
+    cfg.StrOpt(
+        'ssl_key_type',
+        default='rsa2048',
+        choices=['rsa2048', 'rsa3072', 'rsa4096', 'ec-p256', 'ec-p384'],
+        help='Key algorithm of the CA, server and client certificates used '
+             'by the SSL tests.'
+    ),
+    cfg.IntOpt(
+        'consumer_wait_timeout',
+        default=60,
+        help='Timeout in seconds to wait for a barbican secret consumer to '
+             'be registered or removed.'
+    ),
+    cfg.IntOpt(
+        'log_fetch_concurrency',
+        default=8,
+        min=1,
+        help='Maximum number of concurrent swift requests when fetching the '
+             'parts of a guest log.'
+    ),
+    cfg.StrOpt(
+        'artifacts_dir',
+        help='Directory where test artifacts such as the guest logs of '
+             'failed instances are saved. The system temporary directory is '
+             'used if not set.'
+    ),
+    cfg.BoolOpt(
+        'compress_artifacts',
+        default=False,
+        help='Whether to gzip-compress the test artifacts.'
+    ),
+    cfg.BoolOpt(
+        'follow_guest_log',
+        default=False,
+        help='Whether to periodically publish the guest log and save it in '
+             'the artifacts directory while waiting for instances to become '
+             'active.'
+    ),
+    cfg.IntOpt(
+        'guest_log_follow_interval',
+        default=30,
+        help='Interval in seconds between two guest log fetches when '
+             'following the guest log.'
+    ),
+    cfg.BoolOpt(
+        'record_spans',
+        default=False,
+        help='Whether to save the timing spans of the test steps as JSON '
+             'files in the spans subdirectory of the artifacts directory.'
+    ),
+    cfg.BoolOpt(
+        'run_benchmarks',
+        default=False,
+        help='Whether to run the benchmark tests. The benchmarks create many '
+             'instances and take a long time, they should be run on their '
+             'own, e.g. with --regex trove_tempest_plugin.tests.benchmark.'
+    ),
+    cfg.IntOpt(
+        'benchmark_iterations',
+        default=5,
+        min=1,
+        help='Number of times every benchmark worker repeats the measured '
+             'operations.'
+    ),
+    cfg.ListOpt(
+        'benchmark_concurrency',
+        item_type=cfg.types.Integer(min=1),
+        default=[1, 2, 4],
+        help='Numbers of concurrent workers the benchmarks are run with.'
+    ),
+    cfg.ListOpt(
+        'benchmark_dataset_sizes',
+        item_type=cfg.types.Integer(min=1),
+        default=[100, 1024, 10240],
+        help='Sizes in MB of the datasets the backup benchmarks are run '
+             'with. The instance volumes are sized accordingly.'
+    ),
+    cfg.FloatOpt(
+        'benchmark_change_rate',
+        default=0.1,
+        min=0.001,
+        max=1,
+        help='Fraction of the dataset rows changed between the full and the '
+             'incremental backups of the backup benchmarks.'
+    ),
+    cfg.ListOpt(
+        'benchmark_write_rates',
+        item_type=cfg.types.Integer(min=1),
+        default=[100, 500, 2000],
+        help='Target writes per second on the primary the replication '
+             'benchmarks are run with.'
+    ),
+    cfg.IntOpt(
+        'benchmark_duration',
+        default=120,
+        min=10,
+        help='Duration in seconds of every write rate of the replication '
+             'benchmarks.'
+    ),
+    cfg.FloatOpt(
+        'benchmark_max_lag',
+        default=1.0,
+        help='Highest p99 replication lag in seconds for a write rate to be '
+             'considered safe by the replication lag benchmark.'
+    ),
 ]
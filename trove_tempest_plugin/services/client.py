@@ -21,11 +21,23 @@ import tenacity
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions
 
+from trove_tempest_plugin.tests import instrumentation
+
 
 class TroveClient(rest_client.RestClient):
     def __init__(self, auth_provider, **kwargs):
         super(TroveClient, self).__init__(auth_provider, **kwargs)
 
+    def request(self, method, url, extra_headers=False, headers=None,
+                body=None, chunked=False):
+        with instrumentation.span('rest.request', method=method,
+                                  url=url) as span:
+            resp, resp_body = super(TroveClient, self).request(
+                method, url, extra_headers=extra_headers, headers=headers,
+                body=body, chunked=chunked)
+            span.set_attribute('status', resp.status)
+        return resp, resp_body
+
     def get_resource(self, obj, id, expected_status_code=200):
         url = '/%s/%s' % (obj, id)
         resp, body = self.get(url)
@@ -12,9 +12,18 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import codecs
+import collections
+from concurrent import futures
+import contextlib
+import gzip
+import os
+import tempfile
 import time
+from urllib import parse
 
 from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
 from oslo_service import loopingcall
 from oslo_utils import netutils
 from oslo_utils import uuidutils
@@ -25,14 +34,29 @@ from tempest.lib.common.utils import test_utils
 from tempest.lib import exceptions
 from tempest import test
 import tenacity
+from testtools import content
 
 from trove_tempest_plugin.tests import constants
 from trove_tempest_plugin.tests import exceptions as trove_exc
+from trove_tempest_plugin.tests import guest_log
+from trove_tempest_plugin.tests import instrumentation
 from trove_tempest_plugin.tests import utils
+from trove_tempest_plugin.tests import workload
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Size of the chunks when streaming log objects from swift.
+LOG_CHUNK_SIZE = 64 * 1024
+# Number of guest log lines logged when an instance goes to ERROR.
+GUEST_LOG_TAIL_LINES = 200
+# Max number of objects per swift container listing.
+SWIFT_LISTING_LIMIT = 10000
+# Number of concurrent swift requests when deleting objects.
+SWIFT_DELETE_WORKERS = 16
+# Timeout in seconds to empty and delete a swift container.
+SWIFT_PURGE_TIMEOUT = 60
+
 
 class BaseTroveTest(test.BaseTestCase):
     credentials = ('admin', 'primary')
@@ -43,6 +67,8 @@ class BaseTroveTest(test.BaseTestCase):
     password = ""
     create_user = True
     enable_root = False
+    # Whether to create an instance shared by the tests of the class.
+    create_class_instance = True
 
     @classmethod
     def get_resource_name(cls, resource_type):
@@ -101,6 +127,8 @@ class BaseTroveTest(test.BaseTestCase):
         cls.object_client = cls.os_primary.object_client
         cls.admin_container_client = cls.os_admin.container_client
         cls.admin_object_client = cls.os_admin.object_client
+        cls.admin_bulk_client = cls.os_admin.bulk_client
+        cls.admin_capabilities_client = cls.os_admin.capabilities_client
         # Swift client is special, we want to re-use the log_generator func
         # in python-troveclient.
         cls.swift = cls.get_swift_client()
@@ -229,23 +257,236 @@ class BaseTroveTest(test.BaseTestCase):
 
     @classmethod
     def resource_setup(cls):
+        # The spans of the class setup are recorded until the first test
+        # starts.
+        cls._class_recorder = instrumentation.start_recording(
+            f"{cls.__module__}.{cls.__name__}")
+        # (container, prefix) of the followed guest logs to remove.
+        cls._guest_log_purges = set()
+
         super(BaseTroveTest, cls).resource_setup()
 
         # Create network for database instance, use cls.private_network as the
         # network ID.
-        cls._create_network()
+        with cls.span('network.create'):
+            cls._create_network()
 
-        instance = cls.create_instance(create_user=cls.create_user)
-        cls.instance_id = instance['id']
-        cls.wait_for_instance_status(cls.instance_id,
-                                     expected_op_status=["HEALTHY"])
-        cls.instance = cls.client.get_resource(
-            "instances", cls.instance_id)['instance']
-        cls.instance_ip = cls.get_instance_ip(cls.instance)
+        if not cls.create_class_instance:
+            return
+
+        with cls.span('instance.create') as span:
+            instance = cls.create_instance(create_user=cls.create_user)
+            cls.instance_id = instance['id']
+            span.set_attribute('instance_id', cls.instance_id)
+            cls.wait_for_instance_status(cls.instance_id,
+                                         expected_op_status=["HEALTHY"])
+            cls.instance = cls.client.get_resource(
+                "instances", cls.instance_id)['instance']
+            cls.instance_ip = cls.get_instance_ip(cls.instance)
+            cls.wait_for_db_ready(ip=cls.instance_ip)
 
         if cls.enable_root:
             cls.password = cls.get_root_pass(cls.instance_id)
 
+    @classmethod
+    def resource_cleanup(cls):
+        # Save the spans if the class setup failed before any test started.
+        recorder = getattr(cls, '_class_recorder', None)
+        if recorder is not None:
+            instrumentation.stop_recording()
+            cls.save_spans(recorder)
+            cls._class_recorder = None
+        super(BaseTroveTest, cls).resource_cleanup()
+
+    def setUp(self):
+        super(BaseTroveTest, self).setUp()
+        recorder = getattr(self, '_class_recorder', None)
+        if recorder is not None:
+            self.save_spans(recorder)
+            type(self)._class_recorder = None
+
+        recorder = instrumentation.start_recording(self.id())
+        self.addCleanup(self._stop_recording, recorder)
+
+    def _stop_recording(self, recorder):
+        instrumentation.stop_recording()
+        self.save_spans(recorder)
+        spans = recorder.to_dict()
+        self.addDetail('spans', content.json_content(spans))
+
+        transitions = [
+            {'instance_id': span['attributes']['instance_id'],
+             'transitions': span['attributes']['transitions']}
+            for span in instrumentation.iter_spans(
+                spans['spans'], 'instance.wait_status')
+            if span['attributes'].get('transitions')
+        ]
+        if transitions:
+            self.addDetail('status-transitions',
+                           content.json_content(transitions))
+
+    @classmethod
+    def save_spans(cls, recorder):
+        """Save the spans as JSON in the artifacts directory if enabled."""
+        if not CONF.database.record_spans:
+            return
+        spans_dir = os.path.join(
+            CONF.database.artifacts_dir or tempfile.gettempdir(), 'spans')
+        os.makedirs(spans_dir, exist_ok=True)
+        recorder.save(os.path.join(spans_dir, f'{recorder.name}.json'))
+
+    @classmethod
+    def span(cls, name, **attributes):
+        """Time a step of the test, see instrumentation.span()."""
+        attributes.setdefault('datastore', cls.datastore)
+        return instrumentation.span(name, **attributes)
+
+    @classmethod
+    def get_db_url(cls, ip, database=None):
+        """Get the SQLAlchemy URL to connect to the instance database.
+
+        The test user is used if it's created, root if it's enabled.
+        """
+        port = constants.DB_PORTS[cls.datastore]
+        if cls.datastore == 'postgresql':
+            scheme = 'postgresql+psycopg2'
+        else:
+            scheme = 'mysql+pymysql'
+
+        if cls.create_user:
+            database = database or constants.DB_NAME
+            return (f'{scheme}://{constants.DB_USER}:{constants.DB_PASS}@'
+                    f'{ip}:{port}/{database}')
+
+        if cls.enable_root:
+            if cls.datastore == 'postgresql':
+                database = database or 'postgres'
+            return (f'{scheme}://root:{cls.password}@{ip}:{port}/'
+                    f'{database or ""}')
+
+        raise exceptions.TempestException(
+            f"No database user to connect to {ip}, either create_user or "
+            f"enable_root must be set")
+
+    @contextlib.contextmanager
+    def run_workload(self, ip, name):
+        """Run a background workload against the database while in context.
+
+        The per second throughput and latencies are attached to the test
+        result as "workload-<name>". Nothing is run unless enabled by the
+        run_workload config option.
+        """
+        if not CONF.database.run_workload:
+            yield None
+            return
+
+        wl = workload.Workload(
+            self.get_db_url(ip),
+            connections=CONF.database.workload_connections,
+            qps=CONF.database.workload_qps,
+            write_ratio=CONF.database.workload_write_ratio)
+        LOG.info(f"Starting workload on {ip} for {name}")
+        wl.start()
+        try:
+            yield wl
+        finally:
+            wl.stop()
+            series = wl.report()
+            queries = sum(p['reads'] + p['writes'] for p in series)
+            errors = sum(p['errors'] for p in series)
+            LOG.info(f"Workload on {ip} for {name}: {queries} queries, "
+                     f"{errors} errors in {len(series)} seconds")
+            self.addDetail(f'workload-{name}', content.json_content(series))
+
+    @contextlib.contextmanager
+    def probe_availability(self, ip, name):
+        """Measure the database downtime of an operation run in context.
+
+        The unavailability windows are attached to the test result as
+        "downtime-<name>", and the total downtime is checked against the
+        budget of the operation in the downtime_budgets config option.
+        Nothing is measured unless enabled by the run_availability_probe
+        config option.
+        """
+        if not CONF.database.run_availability_probe:
+            yield None
+            return
+
+        probe = utils.AvailabilityProbe(
+            self.get_db_url(ip),
+            interval_ms=CONF.database.availability_probe_interval)
+        LOG.info(f"Starting availability probe on {ip} for {name}")
+        probe.start()
+        try:
+            yield probe
+        finally:
+            probe.stop()
+
+        LOG.info(f"Database on {ip} was unavailable for "
+                 f"{probe.downtime:.3f} seconds during {name}")
+        self.addDetail(f'downtime-{name}', content.json_content(
+            {'downtime': probe.downtime, 'windows': probe.windows}))
+
+        budget = CONF.database.downtime_budgets.get(name)
+        if budget is not None:
+            self.assertLessEqual(
+                probe.downtime, float(budget),
+                f"Downtime of {name} on {ip} exceeds the budget")
+
+    @classmethod
+    @contextlib.contextmanager
+    def follow_guest_log(cls, instance_id):
+        """Follow the guest log of an instance while in context.
+
+        The guest log is appended to guest-log-<instance id>-follow.log in
+        the artifacts directory, and the published log parts are removed at
+        the end of the test class. Nothing is done unless enabled by the
+        follow_guest_log config option.
+        """
+        if not CONF.database.follow_guest_log:
+            yield None
+            return
+
+        artifacts_dir = CONF.database.artifacts_dir or tempfile.gettempdir()
+        os.makedirs(artifacts_dir, exist_ok=True)
+        path = os.path.join(artifacts_dir,
+                            f'guest-log-{instance_id}-follow.log')
+        if CONF.database.compress_artifacts:
+            path += '.gz'
+
+        follower = guest_log.GuestLogFollower(
+            instance_id,
+            lambda: cls.publish_log(instance_id, 'guest'),
+            lambda: cls._get_container_info(instance_id, 'guest'),
+            cls.get_swift_admin_client(),
+            path,
+            interval=CONF.database.guest_log_follow_interval,
+            compress=CONF.database.compress_artifacts)
+        LOG.info(f"Following the guest log of instance {instance_id} in "
+                 f"{path}")
+        try:
+            with follower:
+                yield follower
+        finally:
+            # The log of an instance is followed on every wait, its log parts
+            # only need to be removed once.
+            container, prefix, _ = follower.container_info or (None,) * 3
+            if container and (container, prefix) not in cls._guest_log_purges:
+                cls._guest_log_purges.add((container, prefix))
+                # The whole log container is removed when the instance goes
+                # to ERROR.
+                cls.addClassResourceCleanup(
+                    test_utils.call_and_ignore_notfound_exc,
+                    cls._purge_swift_container,
+                    cls.admin_container_client, cls.admin_object_client,
+                    container, prefix=prefix)
+
+    @contextlib.contextmanager
+    def instance_action(self, ip, name):
+        """Run the background workload and measure downtime in context."""
+        with self.run_workload(ip, name), self.probe_availability(ip, name):
+            yield
+
     def assert_single_item(self, items, **props):
         return self.assert_multiple_items(items, 1, **props)[0]
 
@@ -286,46 +527,164 @@ class BaseTroveTest(test.BaseTestCase):
         except exceptions.NotFound:
             pass
 
+    @classmethod
+    def _bulk_delete_limit(cls, capabilities_client):
+        """Return the max number of objects per bulk delete, 0 if disabled."""
+        try:
+            capabilities = capabilities_client.list_capabilities()
+        except exceptions.TempestException as e:
+            LOG.warning(f"Failed to get the swift capabilities: {e}")
+            return 0
+        bulk_delete = capabilities.get('bulk_delete')
+        if not bulk_delete:
+            return 0
+        return bulk_delete.get('max_deletes_per_request', 10000)
+
+    @classmethod
+    def _bulk_delete_objects(cls, bulk_client, container, names):
+        data = "\n".join(parse.quote(f"/{container}/{name}")
+                         for name in names)
+        resp = bulk_client.delete_bulk_data(
+            data=data,
+            headers={'Accept': 'application/json',
+                     'Content-Type': 'text/plain'})
+        errors = json.loads(resp.data).get('Errors')
+        if errors:
+            LOG.warning(f"Bulk delete of {len(names)} objects in container "
+                        f"{container} failed for: {errors}")
+
+    @classmethod
+    def _purge_swift_container(cls, container_client, object_client,
+                               container, bulk_client=None, bulk_limit=0,
+                               prefix=None):
+        """Delete all the objects in a container, or with a given prefix.
+
+        The container listing is paginated, the objects of every page are
+        deleted concurrently, or with bulk deletes if bulk_client and
+        bulk_limit are set. The whole container is listed again until it's
+        empty, the listing may still show deleted objects for a while in HA
+        deployments.
+        """
+        deadline = time.monotonic() + SWIFT_PURGE_TIMEOUT
+        interval = 0.5
+
+        def _delete_object(name):
+            test_utils.call_and_ignore_notfound_exc(
+                object_client.delete_object, container, name)
+
+        def _delete_batch(names):
+            cls._bulk_delete_objects(bulk_client, container, names)
+
+        with futures.ThreadPoolExecutor(
+                max_workers=SWIFT_DELETE_WORKERS) as executor:
+            while True:
+                marker = None
+                deleted = 0
+                while True:
+                    params = {'limit': SWIFT_LISTING_LIMIT, 'format': 'json'}
+                    if marker:
+                        params['marker'] = marker
+                    if prefix:
+                        params['prefix'] = prefix
+                    _, objlist = container_client.list_container_objects(
+                        container, params)
+                    if not objlist:
+                        break
+
+                    names = [obj['name'] for obj in objlist]
+                    marker = names[-1]
+                    deleted += len(names)
+                    if bulk_client and bulk_limit:
+                        batches = [names[i:i + bulk_limit]
+                                   for i in range(0, len(names), bulk_limit)]
+                        list(executor.map(_delete_batch, batches))
+                    else:
+                        list(executor.map(_delete_object, names))
+
+                if not deleted:
+                    return
+                LOG.info(f"Deleted {deleted} objects in container "
+                         f"{container}")
+                if time.monotonic() > deadline:
+                    LOG.warning(f"Container {container} is still not empty "
+                                f"after {SWIFT_PURGE_TIMEOUT} seconds")
+                    return
+                time.sleep(interval)
+                interval = min(interval * 2, 5)
+
     @classmethod
     def delete_swift_containers(cls, container_client, object_client,
-                                containers):
+                                containers, bulk_client=None,
+                                capabilities_client=None):
         """Remove containers and all objects in them.
 
         The containers should be visible from the container_client given.
         Will not throw any error if the containers don't exist.
         Will not check that object and container deletions succeed.
-        After delete all the objects from a container, it will wait 3
-        seconds before delete the container itself, in order for deployments
-        using HA proxy sync the deletion properly, otherwise, the container
-        might fail to be deleted because it's not empty.
+        The objects are deleted with the swift bulk delete middleware if
+        bulk_client and capabilities_client are given and the middleware is
+        enabled, concurrently one by one otherwise. The container deletion is
+        retried while it's not empty, in order for deployments using HA proxy
+        to sync the deletion of the objects.
         """
         if isinstance(containers, str):
             containers = [containers]
 
+        bulk_limit = 0
+        if bulk_client and capabilities_client:
+            bulk_limit = cls._bulk_delete_limit(capabilities_client)
+
         for cont in containers:
             try:
-                params = {'limit': 9999, 'format': 'json'}
-                _, objlist = container_client.list_container_objects(
-                    cont,
-                    params)
-                # delete every object in the container
-                for obj in objlist:
-                    test_utils.call_and_ignore_notfound_exc(
-                        object_client.delete_object, cont, obj['name'])
-
-                # sleep 3 seconds to sync the deletion of the objects
-                # in HA deployment
-                time.sleep(3)
-
-                container_client.delete_container(cont)
+                cls._purge_swift_container(container_client, object_client,
+                                           cont, bulk_client=bulk_client,
+                                           bulk_limit=bulk_limit)
+                cls._delete_empty_container(container_client, cont)
             except exceptions.NotFound:
                 pass
 
+    @classmethod
+    @tenacity.retry(
+        retry=tenacity.retry_if_exception_type(exceptions.Conflict),
+        wait=tenacity.wait_exponential(multiplier=0.5, max=5),
+        stop=tenacity.stop_after_delay(SWIFT_PURGE_TIMEOUT),
+        reraise=True
+    )
+    def _delete_empty_container(cls, container_client, container):
+        container_client.delete_container(container)
+
+    @classmethod
+    def get_datastore_version(cls):
+        """Get the datastore version used to create instances.
+
+        Get from API if the default ds version is not configured.
+        """
+        default_versions = CONF.database.default_datastore_versions
+        datastore_version = default_versions.get(cls.datastore)
+        if not datastore_version:
+            res = cls.client.list_resources("datastores")
+            for d in res['datastores']:
+                if d['name'] == cls.datastore:
+                    if d.get('default_version'):
+                        datastore_version = d['default_version']
+                    else:
+                        datastore_version = d['versions'][0]['name']
+                    break
+        if not datastore_version:
+            message = ('Failed to get available datastore version.')
+            raise exceptions.TempestException(message)
+        return datastore_version
+
+    @classmethod
+    def get_volume_size(cls):
+        """Get the default volume size in GB of the instances."""
+        return 1
+
     @classmethod
     def create_instance(cls, name=None, datastore_version=None,
                         database=constants.DB_NAME, username=constants.DB_USER,
                         password=constants.DB_PASS, backup_id=None,
-                        replica_of=None, create_user=True):
+                        replica_of=None, create_user=True, volume_size=None):
         """Create database instance.
 
         Creating database instance is time-consuming, so we define this method
@@ -335,6 +694,7 @@ class BaseTroveTest(test.BaseTestCase):
         all test methods within a TestCase are assumed to be executed serially.
         """
         name = name or cls.get_resource_name("instance")
+        volume_size = volume_size or cls.get_volume_size()
 
         # Flavor, volume, datastore are not needed for creating replica.
         if replica_of:
@@ -347,23 +707,8 @@ class BaseTroveTest(test.BaseTestCase):
                 }
             }
 
-        # Get datastore version. Get from API if the default ds version is not
-        # configured.
         elif not datastore_version:
-            default_versions = CONF.database.default_datastore_versions
-            datastore_version = default_versions.get(cls.datastore)
-            if not datastore_version:
-                res = cls.client.list_resources("datastores")
-                for d in res['datastores']:
-                    if d['name'] == cls.datastore:
-                        if d.get('default_version'):
-                            datastore_version = d['default_version']
-                        else:
-                            datastore_version = d['versions'][0]['name']
-                        break
-            if not datastore_version:
-                message = ('Failed to get available datastore version.')
-                raise exceptions.TempestException(message)
+            datastore_version = cls.get_datastore_version()
 
         if not replica_of:
             body = {
@@ -375,7 +720,7 @@ class BaseTroveTest(test.BaseTestCase):
                     },
                     "flavorRef": CONF.database.flavor_id,
                     "volume": {
-                        "size": 1,
+                        "size": volume_size,
                         "type": CONF.database.volume_type
                     },
                     "nics": [{"net-id": cls.private_network}],
@@ -406,32 +751,69 @@ class BaseTroveTest(test.BaseTestCase):
         return res["instance"]
 
     @classmethod
-    def restart_instance(cls, instance_id):
-        """Restart database service and wait until it's healthy."""
-        cls.client.create_resource(
-            f"instances/{instance_id}/action",
-            {"restart": {}},
-            expected_status_code=202,
-            need_response=False)
-        cls.wait_for_instance_status(instance_id,
-                                     expected_op_status=["HEALTHY"])
+    def restart_instance(cls, instance_id, interval=10, initial_delay=5):
+        """Restart database service and wait until it's healthy.
+
+        interval and initial_delay are passed to wait_for_instance_status.
+        """
+        with cls.span('instance.restart', instance_id=instance_id,
+                      operation='restart'):
+            cls.client.create_resource(
+                f"instances/{instance_id}/action",
+                {"restart": {}},
+                expected_status_code=202,
+                need_response=False)
+            cls.wait_for_instance_status(instance_id,
+                                         expected_op_status=["HEALTHY"],
+                                         interval=interval,
+                                         initial_delay=initial_delay)
+            cls.wait_for_db_ready(instance_id)
+
+    @classmethod
+    def wait_for_db_ready(cls, instance_id=None, ip=None):
+        """Wait until the database of the instance accepts connections.
+
+        The instance becoming HEALTHY doesn't guarantee the database port
+        accepts connections yet, e.g. right after a restart or resize.
+        """
+        if not ip:
+            instance = cls.client.get_resource(
+                "instances", instance_id)['instance']
+            ip = cls.get_instance_ip(instance)
+
+        with cls.span('database.wait_ready', ip=ip):
+            latency = utils.wait_for_db_ready(
+                ip, cls.datastore,
+                timeout=CONF.database.database_ready_timeout)
+        LOG.info(f"Database on {ip} is ready after {latency:.3f} seconds")
+        return latency
 
     @classmethod
     def wait_for_instance_status(cls, id,
                                  expected_status=["ACTIVE"],
                                  expected_op_status=[],
                                  need_delete=False,
-                                 timeout=CONF.database.database_build_timeout):
+                                 timeout=CONF.database.database_build_timeout,
+                                 interval=10, initial_delay=5):
+        history = instrumentation.StatusHistory()
+
         def _wait():
             try:
                 res = cls.client.get_resource("instances", id)
                 cur_status = res["instance"]["status"]
             except exceptions.NotFound:
+                history.record("DELETED")
                 if need_delete or "DELETED" in expected_status:
                     LOG.info('Instance %s is deleted', id)
                     raise loopingcall.LoopingCallDone()
                 return
 
+            op_status = res["instance"].get("operating_status")
+            if history.record(cur_status, op_status):
+                instrumentation.event('instance.status', instance_id=id,
+                                      status=cur_status,
+                                      operating_status=op_status)
+
             if cur_status in expected_status:
                 LOG.info('Instance %s becomes %s', id, cur_status)
                 if expected_op_status:
@@ -456,13 +838,13 @@ class BaseTroveTest(test.BaseTestCase):
                     LOG.info(f"Publishing guest log for instance {id}")
                     cls.publish_log(id, 'guest')
                     LOG.info(f"Getting guest log content for instance {id}")
-                    log_gen = cls.log_generator(id, 'guest', lines=0)
-                    log_content = "".join([chunk for chunk in log_gen()])
+                    path, tail = cls.save_guest_log(id)
                     LOG.info(
                         f"\n=============================================\n"
-                        f"Trove guest agent log for instance {id}\n"
+                        f"Trove guest agent log for instance {id}, last "
+                        f"{len(tail)} lines, full log saved to {path}\n"
                         f"=============================================")
-                    LOG.info(log_content)
+                    LOG.info("\n".join(tail))
                 except Exception as err:
                     LOG.warning(f"Failed to get guest log for instance {id}, "
                                 f"error: {str(err)}")
@@ -472,7 +854,9 @@ class BaseTroveTest(test.BaseTestCase):
                              f"{CONF.database.database_log_container}")
                     cls.delete_swift_containers(
                         cls.admin_container_client, cls.admin_object_client,
-                        CONF.database.database_log_container)
+                        CONF.database.database_log_container,
+                        bulk_client=cls.admin_bulk_client,
+                        capabilities_client=cls.admin_capabilities_client)
 
                 message = "Instance status is ERROR."
                 caller = test_utils.find_test_caller()
@@ -498,9 +882,22 @@ class BaseTroveTest(test.BaseTestCase):
             LOG.info(f"Deleting instance {id}")
             cls.admin_client.force_delete_instance(id)
 
+        # The guest log is only followed while the instance is being built,
+        # restored, upgraded, etc.
+        follow_log = not (need_delete or "DELETED" in expected_status)
         timer = loopingcall.FixedIntervalWithTimeoutLoopingCall(_wait)
         try:
-            timer.start(interval=10, timeout=timeout, initial_delay=5).wait()
+            with cls.span('instance.wait_status', instance_id=id,
+                          expected_status=expected_status,
+                          expected_op_status=expected_op_status) as span, \
+                    (cls.follow_guest_log(id) if follow_log
+                     else contextlib.nullcontext()):
+                try:
+                    timer.start(interval=interval, timeout=timeout,
+                                initial_delay=initial_delay).wait()
+                finally:
+                    span.set_attribute('transitions', history.transitions)
+                    LOG.info(f"Instance {id} status history: {history}")
         except loopingcall.LoopingCallTimeOut:
             message = ("Instance %s is not in the expected status: %s" %
                        (id, expected_status))
@@ -636,8 +1033,10 @@ class BaseTroveTest(test.BaseTestCase):
 
         timer = loopingcall.FixedIntervalWithTimeoutLoopingCall(_wait)
         try:
-            timer.start(interval=10,
-                        timeout=CONF.database.backup_wait_timeout).wait()
+            with cls.span('backup.wait_status', backup_id=id,
+                          expected_status=expected_status):
+                timer.start(interval=10,
+                            timeout=CONF.database.backup_wait_timeout).wait()
         except loopingcall.LoopingCallTimeOut:
             message = ("Backup %s is not in the expected status: %s" %
                        (id, expected_status))
@@ -675,12 +1074,15 @@ class BaseTroveTest(test.BaseTestCase):
                 "image_id": image_id
             }
         }
-        cls.admin_client.create_resource(
-            f"mgmt/instances/{instance_id}/action",
-            rebuild_req, expected_status_code=202,
-            need_response=False)
-        cls.wait_for_instance_status(instance_id,
-                                     expected_op_status=["HEALTHY"])
+        with cls.span('instance.rebuild', instance_id=instance_id,
+                      operation='rebuild'):
+            cls.admin_client.create_resource(
+                f"mgmt/instances/{instance_id}/action",
+                rebuild_req, expected_status_code=202,
+                need_response=False)
+            cls.wait_for_instance_status(instance_id,
+                                         expected_op_status=["HEALTHY"])
+            cls.wait_for_db_ready(instance_id)
 
     @classmethod
     def create_config(cls, name, values, datastore, datastore_version):
@@ -754,6 +1156,7 @@ class BaseTroveTest(test.BaseTestCase):
         This method is copied from python-troveclient.
         """
         swift_cli = cls.swift_admin if log_name == 'guest' else cls.swift
+        concurrency = CONF.database.log_fetch_concurrency
 
         def _log_generator(instance_id, log_name, lines):
             try:
@@ -763,44 +1166,135 @@ class BaseTroveTest(test.BaseTestCase):
                 head, body = swift_cli.get_container(container, prefix=prefix)
                 log_obj_to_display = []
 
-                if lines:
-                    total_lines = lines
-                    partial_results = False
-                    parts = sorted(body, key=lambda obj: obj['last_modified'],
-                                   reverse=True)
-
-                    for part in parts:
-                        obj_hdrs = swift_cli.head_object(
-                            container,
-                            part['name'])
-                        obj_lines = int(obj_hdrs['x-object-meta-lines'])
-                        log_obj_to_display.insert(0, part)
-                        if obj_lines >= lines:
-                            partial_results = True
-                            break
-                        lines -= obj_lines
-                    if not partial_results:
-                        lines = total_lines
-
-                    part = log_obj_to_display.pop(0)
-                    hdrs, log_obj = swift_cli.get_object(
-                        container,
-                        part['name'])
-                    log_by_lines = log_obj.decode().splitlines()
-                    yield "\n".join(log_by_lines[-1 * lines:]) + "\n"
-                else:
-                    # Show all the logs
-                    log_obj_to_display = sorted(
-                        body, key=lambda obj: obj['last_modified'])
-
-                for log_part in log_obj_to_display:
-                    headers, log_obj = swift_cli.get_object(
-                        container,
-                        log_part['name'])
-                    yield log_obj.decode()
+                # swiftclient connections can't be shared between threads,
+                # every concurrent request uses a new connection with the
+                # token of the client.
+                url, token = swift_cli.url, swift_cli.token
+
+                def _head_lines(part):
+                    # Empty parts don't need a request.
+                    if not part.get('bytes', 1):
+                        return 0
+                    obj_hdrs = swift_client.head_object(
+                        url, token, container, part['name'])
+                    return int(obj_hdrs['x-object-meta-lines'])
+
+                def _get_body(part):
+                    return swift_client.get_object(
+                        url, token, container, part['name'])[1]
+
+                def _open_body(part):
+                    # Return an iterator over the chunks of the body, only
+                    # the response headers are read here.
+                    return swift_client.get_object(
+                        url, token, container, part['name'],
+                        resp_chunk_size=LOG_CHUNK_SIZE)[1]
+
+                def _get_tail(part, lines):
+                    """Get the last lines of a part with Range requests.
+
+                    The part is read backwards in growing chunks until it
+                    contains enough lines, or entirely if it's too short.
+                    """
+                    end = part.get('bytes')
+                    if end is None:
+                        return _get_body(part).splitlines()[-1 * lines:]
+
+                    data = b''
+                    chunk_size = 64 * 1024
+                    # One more line break than lines is needed to be sure
+                    # that the first line is complete.
+                    while end > 0 and data.count(b'\n') <= lines:
+                        start = max(0, end - chunk_size)
+                        data = swift_client.get_object(
+                            url, token, container, part['name'],
+                            headers={'Range': f'bytes={start}-{end - 1}'}
+                        )[1] + data
+                        end = start
+                        chunk_size *= 2
+                    return data.splitlines()[-1 * lines:]
+
+                with futures.ThreadPoolExecutor(
+                        max_workers=concurrency) as executor:
+                    if lines:
+                        total_lines = lines
+                        partial_results = False
+                        parts = sorted(body,
+                                       key=lambda obj: obj['last_modified'],
+                                       reverse=True)
+
+                        for part, obj_lines in zip(parts, utils.prefetch_map(
+                                executor, _head_lines, parts, concurrency)):
+                            log_obj_to_display.insert(0, part)
+                            if obj_lines >= lines:
+                                partial_results = True
+                                break
+                            lines -= obj_lines
+                        if not partial_results:
+                            lines = total_lines
+
+                        # Only the end of the oldest part is needed, start
+                        # downloading the next parts meanwhile.
+                        bodies = utils.prefetch_map(
+                            executor, _open_body, log_obj_to_display[1:],
+                            concurrency)
+                        log_by_lines = _get_tail(log_obj_to_display[0], lines)
+                        yield b"\n".join(log_by_lines).decode() + "\n"
+                    else:
+                        # Show all the logs
+                        log_obj_to_display = sorted(
+                            body, key=lambda obj: obj['last_modified'])
+                        bodies = utils.prefetch_map(
+                            executor, _open_body, log_obj_to_display,
+                            concurrency)
+
+                    # The next parts are requested while the previous ones
+                    # are being consumed. The bodies are streamed, a chunk
+                    # may end in the middle of a multi-byte character.
+                    for log_obj in bodies:
+                        decoder = codecs.getincrementaldecoder('utf-8')()
+                        for chunk in log_obj:
+                            text = decoder.decode(chunk)
+                            if text:
+                                yield text
+                        text = decoder.decode(b'', final=True)
+                        if text:
+                            yield text
             except swift_client.ClientException as ex:
                 if ex.http_status == 404:
                     raise trove_exc.GuestLogNotFound()
                 raise trove_exc.TroveTempestException()
 
         return lambda: _log_generator(instance_id, log_name, lines)
+
+    @classmethod
+    def save_guest_log(cls, instance_id):
+        """Stream the published guest log of an instance to a file.
+
+        The file is written in the artifacts directory, gzip-compressed if
+        configured.
+
+        :returns: The path of the file and the last lines of the log.
+        """
+        artifacts_dir = CONF.database.artifacts_dir or tempfile.gettempdir()
+        os.makedirs(artifacts_dir, exist_ok=True)
+        path = os.path.join(artifacts_dir, f'guest-log-{instance_id}.log')
+        if CONF.database.compress_artifacts:
+            path += '.gz'
+            opener = gzip.open
+        else:
+            opener = open
+
+        tail = collections.deque(maxlen=GUEST_LOG_TAIL_LINES)
+        partial_line = ''
+        log_gen = cls.log_generator(instance_id, 'guest', lines=0)
+        with opener(path, 'wt', encoding='utf-8') as f:
+            for chunk in log_gen():
+                f.write(chunk)
+                lines = (partial_line + chunk).split('\n')
+                partial_line = lines.pop()
+                tail.extend(lines)
+        if partial_line:
+            tail.append(partial_line)
+
+        return path, list(tail)
@@ -0,0 +1,83 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import os
+import tempfile
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+from tempest import config
+from testtools import content
+
+from trove_tempest_plugin.tests import constants
+from trove_tempest_plugin.tests import utils
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+
+class BenchmarkMixin(object):
+    """Common helpers of the benchmark tests.
+
+    Benchmarks are skipped unless the run_benchmarks config option is
+    enabled. The results are attached to the test and saved as JSON in the
+    benchmarks subdirectory of the artifacts directory.
+    """
+
+    @classmethod
+    def skip_checks(cls):
+        super(BenchmarkMixin, cls).skip_checks()
+
+        if not CONF.database.run_benchmarks:
+            raise cls.skipException("Benchmarks are not enabled.")
+
+    @classmethod
+    def get_root_db_url(cls, ip):
+        """Get the SQLAlchemy URL to connect to the database as root.
+
+        Requires root to be enabled, see enable_root.
+        """
+        port = constants.DB_PORTS[cls.datastore]
+        if cls.datastore == 'postgresql':
+            return (f'postgresql+psycopg2://root:{cls.password}@'
+                    f'{ip}:{port}/postgres')
+
+        return (f'mysql+pymysql://root:{cls.password}@{ip}:{port}/'
+                f'{constants.DB_NAME}')
+
+    @staticmethod
+    def summarize(values):
+        """Return the count, mean, min, max and percentiles of values."""
+        if not values:
+            return {'count': 0}
+
+        summary = {
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'min': min(values),
+            'max': max(values),
+        }
+        summary.update(utils.percentiles(values))
+        return summary
+
+    def save_results(self, name, results):
+        name = f'{name}-{self.datastore}'
+        self.addDetail(f'benchmark-{name}', content.json_content(results))
+
+        results_dir = os.path.join(
+            CONF.database.artifacts_dir or tempfile.gettempdir(),
+            'benchmarks')
+        os.makedirs(results_dir, exist_ok=True)
+        path = os.path.join(results_dir, f'{name}.json')
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        LOG.info(f"Benchmark {name} results saved to {path}")
+        return path
@@ -0,0 +1,190 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import time
+
+from oslo_log import log as logging
+from tempest import config
+
+from trove_tempest_plugin.tests import base as trove_base
+from trove_tempest_plugin.tests.benchmark import base
+from trove_tempest_plugin.tests import dataset
+from trove_tempest_plugin.tests import utils
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+PHASES = ('full-backup', 'incremental-backup', 'restore')
+
+
+class TestBackupBenchmarkBase(base.BenchmarkMixin, trove_base.BaseTroveTest):
+    """Measure the backup and restore throughput for growing datasets.
+
+    For every configured dataset size, an instance is created and loaded
+    with the dataset, then the full backup, the incremental backup after
+    changing a fraction of the rows and the restore of the full backup are
+    timed.
+    """
+    create_class_instance = False
+    # None is the default storage driver, i.e. swift.
+    storage_driver = None
+
+    @classmethod
+    def resource_setup(cls):
+        super(TestBackupBenchmarkBase, cls).resource_setup()
+
+        if CONF.database.remove_swift_account:
+            cls.addClassResourceCleanup(cls.delete_swift_account)
+
+        cls.datastore_version = cls.get_datastore_version()
+
+    @classmethod
+    def _execute_func(cls, db_client):
+        if cls.datastore == 'postgresql':
+            return db_client.pgsql_execute
+        return db_client.mysql_execute
+
+    @classmethod
+    def load_data(cls, ip, data):
+        with utils.SQLClient(cls.get_db_url(ip)) as db_client:
+            if cls.datastore == 'postgresql':
+                data.load_pgsql(db_client)
+            else:
+                data.load_mysql(db_client)
+
+    @classmethod
+    def change_data(cls, ip, data, rate):
+        with utils.SQLClient(cls.get_db_url(ip)) as db_client:
+            return data.change(cls._execute_func(db_client), rate)
+
+    @classmethod
+    def _backup(cls, instance_id, name, parent_id=None):
+        start = time.monotonic()
+        backup = cls.create_backup(
+            instance_id, cls.get_resource_name(name),
+            incremental=parent_id is not None, parent_id=parent_id,
+            storage_driver=cls.storage_driver)
+        cls.wait_for_backup_status(backup['id'])
+        elapsed = time.monotonic() - start
+        backup = cls.client.get_resource("backups", backup['id'])['backup']
+        return backup, elapsed
+
+    @classmethod
+    def _delete_backup(cls, backup_id):
+        cls.wait_for_backup_status(backup_id, expected_status="DELETED",
+                                   need_delete=True)
+
+    @classmethod
+    def run_size(cls, size_mb, change_rate):
+        """Run the backup and restore of a dataset of size_mb MB."""
+        LOG.info(f"Running backup benchmark with a {size_mb}MB dataset")
+        volume_size = dataset.volume_size(size_mb)
+        data = dataset.DatasetGenerator(size_mb)
+        result = {'size_mb': size_mb, 'volume_size': volume_size}
+
+        with cls.span('benchmark.backup', size_mb=size_mb,
+                      storage_driver=cls.storage_driver):
+            instance = cls.create_instance(
+                cls.get_resource_name(f"bench-{size_mb}"),
+                datastore_version=cls.datastore_version,
+                create_user=cls.create_user, volume_size=volume_size)
+            instance_id = instance['id']
+            cls.wait_for_instance_status(instance_id,
+                                         expected_op_status=["HEALTHY"])
+            if cls.enable_root:
+                cls.password = cls.get_root_pass(instance_id)
+            instance = cls.client.get_resource(
+                "instances", instance_id)['instance']
+            ip = cls.get_instance_ip(instance)
+            cls.wait_for_db_ready(ip=ip)
+
+            start = time.monotonic()
+            cls.load_data(ip, data)
+            result['load'] = time.monotonic() - start
+
+            backup, elapsed = cls._backup(instance_id, "backup")
+            result['full-backup'] = {
+                'seconds': elapsed, 'mb': size_mb,
+                'backup_size': backup.get('size')}
+
+            changed_rows = cls.change_data(ip, data, change_rate)
+            changed_mb = changed_rows * dataset.ROW_SIZE / 1024 / 1024
+            backup_inc, elapsed = cls._backup(
+                instance_id, "backup-inc", parent_id=backup['id'])
+            result['incremental-backup'] = {
+                'seconds': elapsed, 'mb': changed_mb,
+                'changed_rows': changed_rows,
+                'backup_size': backup_inc.get('size')}
+
+            # The backup is taken, the source instance isn't needed anymore.
+            cls.wait_for_instance_status(instance_id,
+                                         expected_status="DELETED",
+                                         need_delete=True)
+
+            start = time.monotonic()
+            restore_instance = cls.create_instance(
+                cls.get_resource_name(f"restore-{size_mb}"),
+                datastore_version=backup['datastore']['version'],
+                backup_id=backup['id'], create_user=cls.create_user,
+                volume_size=volume_size)
+            cls.wait_for_instance_status(
+                restore_instance['id'], expected_op_status=["HEALTHY"],
+                timeout=CONF.database.database_restore_timeout)
+            result['restore'] = {'seconds': time.monotonic() - start,
+                                 'mb': size_mb}
+
+            cls.wait_for_instance_status(restore_instance['id'],
+                                         expected_status="DELETED",
+                                         need_delete=True)
+            cls._delete_backup(backup_inc['id'])
+            cls._delete_backup(backup['id'])
+
+        for phase in PHASES:
+            result[phase]['mb_per_second'] = (
+                result[phase]['mb'] / result[phase]['seconds'])
+            LOG.info(f"{phase} of {size_mb}MB with storage driver "
+                     f"{cls.storage_driver or 'swift'}: "
+                     f"{result[phase]['seconds']:.1f}s, "
+                     f"{result[phase]['mb_per_second']:.2f}MB/s")
+        return result
+
+    @staticmethod
+    def add_scaling(results):
+        """Compare the duration growth of every phase with the size growth.
+
+        The scaling of a size is its duration ratio to the smallest size
+        divided by its size ratio, it stays around 1 as long as the duration
+        grows linearly with the size.
+        """
+        if not results:
+            return
+        first = results[0]
+        for result in results:
+            for phase in PHASES:
+                size_ratio = result[phase]['mb'] / first[phase]['mb']
+                time_ratio = result[phase]['seconds'] / first[phase]['seconds']
+                result[phase]['scaling'] = time_ratio / size_ratio
+
+    def backup_benchmark_test(self):
+        change_rate = CONF.database.benchmark_change_rate
+        sizes = sorted(CONF.database.benchmark_dataset_sizes)
+        levels = [self.run_size(size_mb, change_rate) for size_mb in sizes]
+        self.add_scaling(levels)
+
+        results = {
+            'datastore': self.datastore,
+            'datastore_version': self.datastore_version,
+            'storage_driver': self.storage_driver or 'swift',
+            'change_rate': change_rate,
+            'sizes': levels,
+        }
+        self.save_results(
+            f'backup-{self.storage_driver or "swift"}', results)
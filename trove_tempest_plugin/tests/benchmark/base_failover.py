@@ -0,0 +1,173 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import time
+
+from oslo_log import log as logging
+from tempest import config
+from tempest.lib import exceptions
+
+from trove_tempest_plugin.tests.benchmark import base_replication
+from trove_tempest_plugin.tests import workload
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Seconds of writes to the primary before promoting a replica, and after
+# the whole cluster follows the new primary.
+WARMUP_TIME = 5
+SETTLE_TIME = 5
+FOLLOW_POLL_INTERVAL = 2
+
+
+class TestFailoverBenchmarkBase(
+        base_replication.TestReplicationLagBenchmarkBase):
+    """Measure the write recovery time of promote_to_replica_source.
+
+    Every run promotes a replica of the current primary while writing to
+    both the current primary and the promoted replica. The time until the
+    promoted replica accepts writes, the time until the other instances
+    follow it and the acknowledged writes missing on the new primary are
+    reported.
+    """
+
+    def _writer_url(self, instance_id):
+        # Root bypasses read_only on MySQL replicas, while PostgreSQL
+        # standbys refuse all writes.
+        ip = self.ips[instance_id]
+        if self.datastore == 'postgresql':
+            return self.get_root_db_url(ip)
+        return self.get_db_url(ip)
+
+    def _delete_followers(self):
+        # The current primary can only be deleted after its replicas.
+        for instance_id in self.followers:
+            self.wait_for_instance_status(instance_id, need_delete=True,
+                                          expected_status='DELETED')
+
+    def wait_for_followers(self, primary_id, follower_ids, start):
+        """Wait until the instances are HEALTHY replicas of primary_id.
+
+        The instances are polled every FOLLOW_POLL_INTERVAL seconds, which
+        bounds the resolution of the follow times.
+
+        :returns: {instance id: seconds since start} when every instance
+                  was seen following the primary.
+        """
+        followed = {}
+        deadline = start + CONF.database.database_build_timeout
+        pending = [primary_id] + list(follower_ids)
+        while pending:
+            for instance_id in list(pending):
+                instance = self.client.get_resource(
+                    "instances", instance_id)['instance']
+                if instance['status'] == "ERROR":
+                    raise exceptions.UnexpectedResponseCode(
+                        f"Instance {instance_id} status is ERROR.")
+                if instance.get('operating_status') != "HEALTHY":
+                    continue
+                replica_of = (instance.get('replica_of') or {}).get('id')
+                if instance_id == primary_id or replica_of == primary_id:
+                    followed[instance_id] = time.monotonic() - start
+                    pending.remove(instance_id)
+
+            if pending:
+                if time.monotonic() > deadline:
+                    raise exceptions.TimeoutException(
+                        f"Instances {pending} don't follow the new primary "
+                        f"{primary_id}")
+                time.sleep(FOLLOW_POLL_INTERVAL)
+        return followed
+
+    def run_failover(self, index):
+        primary_id = self.primary_id
+        candidate_id = self.followers[0]
+        others = self.followers[1:] + [primary_id]
+        LOG.info(f"Failover run {index}: promoting {candidate_id} to "
+                 f"replace {primary_id}")
+
+        old_writer = workload.AckedWriter(
+            self._writer_url(primary_id), f'run{index}-old')
+        new_writer = workload.AckedWriter(
+            self._writer_url(candidate_id), f'run{index}-new')
+        old_writer.setup()
+
+        start = time.monotonic()
+        old_writer.start(start)
+        new_writer.start(start)
+        try:
+            time.sleep(WARMUP_TIME)
+            with self.span('replica.promote', instance_id=candidate_id,
+                           operation='promote', run=index):
+                promoted = time.monotonic()
+                self.client.create_resource(
+                    f"instances/{candidate_id}/action",
+                    {"promote_to_replica_source": {}},
+                    expected_status_code=202, need_response=False)
+                followed = self.wait_for_followers(candidate_id, others,
+                                                   promoted)
+            time.sleep(SETTLE_TIME)
+        finally:
+            old_writer.stop()
+            new_writer.stop()
+
+        self.primary_id = candidate_id
+        self.followers = others
+
+        promoted -= start
+        new_url = self._writer_url(candidate_id)
+        lost = [seq for writer in (old_writer, new_writer)
+                for seq in writer.missing(new_url)]
+        old_acks = [t - promoted for _, t in old_writer.acked
+                    if t > promoted]
+        result = {
+            'primary': primary_id,
+            'promoted': candidate_id,
+            'recovery': (new_writer.first_ack - promoted
+                         if new_writer.first_ack is not None else None),
+            # How long the old primary kept acknowledging writes after the
+            # promote request.
+            'old_primary_writes': max(old_acks, default=0),
+            'follow': {instance_id: followed[instance_id]
+                       for instance_id in others},
+            'follow_max': max(followed[instance_id]
+                              for instance_id in others),
+            'acked': len(old_writer.acked) + len(new_writer.acked),
+            'lost': len(lost),
+        }
+        LOG.info(f"Failover run {index}: writes recovered after "
+                 f"{result['recovery']}s, cluster followed after "
+                 f"{result['follow_max']:.1f}s, {result['lost']} of "
+                 f"{result['acked']} acknowledged writes lost")
+        return result
+
+    def failover_benchmark_test(self):
+        self.ips = {self.instance_id: self.instance_ip, **self.replicas}
+        self.primary_id = self.instance_id
+        self.followers = list(self.replicas)
+        self.addCleanup(self._delete_followers)
+
+        runs = [self.run_failover(index)
+                for index in range(CONF.database.benchmark_iterations)]
+
+        recoveries = [run['recovery'] for run in runs
+                      if run['recovery'] is not None]
+        results = {
+            'datastore': self.datastore,
+            'replicas': len(self.replicas),
+            'recovery': self.summarize(recoveries),
+            'follow': self.summarize([run['follow_max'] for run in runs]),
+            'lost': self.summarize([run['lost'] for run in runs]),
+            'runs': runs,
+        }
+        self.save_results('failover', results)
+        self.assertEqual(len(runs), len(recoveries),
+                         "The promoted replica never accepted writes")
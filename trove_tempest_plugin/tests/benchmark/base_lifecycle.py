@@ -0,0 +1,165 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import collections
+from concurrent import futures
+import time
+
+from oslo_log import log as logging
+from tempest import config
+
+from trove_tempest_plugin.tests import base as trove_base
+from trove_tempest_plugin.tests.benchmark import base
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Seconds between two status polls of the instances, which bounds the
+# resolution of the latencies.
+POLL_INTERVAL = 1
+OPERATIONS = ('create', 'restart', 'update-access', 'configuration-attach',
+              'delete')
+
+
+class TestLifecycleBenchmarkBase(base.BenchmarkMixin,
+                                 trove_base.BaseTroveTest):
+    """Measure the latency of the instance lifecycle operations.
+
+    Every worker repeatedly creates an instance, restarts it, updates its
+    access, attaches a configuration and force deletes it, every operation
+    is timed until the instance is HEALTHY again, or gone. The status is
+    polled every POLL_INTERVAL seconds instead of the default 10 seconds.
+    """
+    create_class_instance = False
+    # A configuration value which can be changed on every datastore.
+    config_values = {"max_connections": 200}
+
+    @classmethod
+    def resource_setup(cls):
+        super(TestLifecycleBenchmarkBase, cls).resource_setup()
+
+        cls.datastore_version = cls.get_datastore_version()
+        config = cls.create_config(
+            cls.get_resource_name('config'), cls.config_values,
+            cls.datastore, cls.datastore_version)
+        cls.config_id = config['configuration']['id']
+        cls.addClassResourceCleanup(cls.client.delete_resource,
+                                    'configurations', cls.config_id,
+                                    ignore_notfound=True)
+
+    @classmethod
+    def _timed(cls, latencies, operation, func, *args, **kwargs):
+        start = time.monotonic()
+        ret = func(*args, **kwargs)
+        latencies[operation].append(time.monotonic() - start)
+        return ret
+
+    @classmethod
+    def _create(cls, name):
+        instance = cls.create_instance(
+            name=name, datastore_version=cls.datastore_version,
+            create_user=cls.create_user)
+        cls.wait_for_instance_status(instance['id'],
+                                     expected_op_status=["HEALTHY"],
+                                     interval=POLL_INTERVAL, initial_delay=0)
+        return instance['id']
+
+    @classmethod
+    def _restart(cls, instance_id):
+        cls.restart_instance(instance_id, interval=POLL_INTERVAL,
+                             initial_delay=0)
+
+    @classmethod
+    def _update_access(cls, instance_id):
+        body = {"instance": {"access": {"is_public": False}}}
+        cls.client.put_resource(f'instances/{instance_id}', body)
+        cls.wait_for_instance_status(instance_id,
+                                     expected_op_status=["HEALTHY"],
+                                     interval=POLL_INTERVAL, initial_delay=0)
+
+    @classmethod
+    def _attach_config(cls, instance_id):
+        cls.attach_config(instance_id, cls.config_id)
+        # Some datastores need a restart to apply the configuration, only
+        # the attachment is measured.
+        cls.wait_for_instance_status(
+            instance_id, expected_status=["ACTIVE", "RESTART_REQUIRED"],
+            expected_op_status=["HEALTHY"], interval=POLL_INTERVAL,
+            initial_delay=0)
+
+    @classmethod
+    def _delete(cls, instance_id):
+        cls.wait_for_instance_status(instance_id, need_delete=True,
+                                     expected_status="DELETED",
+                                     interval=POLL_INTERVAL, initial_delay=0)
+
+    @classmethod
+    def _worker(cls, index, iterations):
+        latencies = collections.defaultdict(list)
+        for iteration in range(iterations):
+            name = cls.get_resource_name(f"bench-{index}-{iteration}")
+            instance_id = cls._timed(latencies, 'create', cls._create, name)
+            try:
+                cls._timed(latencies, 'restart', cls._restart,
+                           instance_id)
+                cls._timed(latencies, 'update-access', cls._update_access,
+                           instance_id)
+                cls._timed(latencies, 'configuration-attach',
+                           cls._attach_config, instance_id)
+            finally:
+                cls._timed(latencies, 'delete', cls._delete, instance_id)
+        return latencies
+
+    def run_level(self, concurrency, iterations):
+        """Run the lifecycle with concurrent workers.
+
+        :returns: The latency summary and throughput of every operation.
+        """
+        LOG.info(f"Running lifecycle benchmark with {concurrency} workers "
+                 f"and {iterations} iterations")
+        latencies = collections.defaultdict(list)
+        start = time.monotonic()
+        with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            workers = [executor.submit(self._worker, index, iterations)
+                       for index in range(concurrency)]
+            for worker in workers:
+                for operation, values in worker.result().items():
+                    latencies[operation].extend(values)
+        elapsed = time.monotonic() - start
+
+        results = {'concurrency': concurrency, 'iterations': iterations,
+                   'elapsed': elapsed, 'operations': {}}
+        for operation in OPERATIONS:
+            summary = self.summarize(latencies[operation])
+            # Operations completed per minute over the whole run.
+            summary['throughput'] = summary['count'] * 60 / elapsed
+            results['operations'][operation] = summary
+            if summary['count']:
+                LOG.info(f"{operation} at concurrency {concurrency}: "
+                         f"p50={summary['p50']:.1f}s "
+                         f"p95={summary['p95']:.1f}s "
+                         f"p99={summary['p99']:.1f}s "
+                         f"throughput={summary['throughput']:.2f}/min")
+        return results
+
+    def lifecycle_benchmark_test(self):
+        results = {
+            'datastore': self.datastore,
+            'datastore_version': self.datastore_version,
+            # The latencies are only accurate to the poll interval.
+            'resolution': POLL_INTERVAL,
+            'levels': [
+                self.run_level(concurrency,
+                               CONF.database.benchmark_iterations)
+                for concurrency in CONF.database.benchmark_concurrency
+            ],
+        }
+        self.save_results('lifecycle', results)
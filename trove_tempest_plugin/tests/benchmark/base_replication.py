@@ -0,0 +1,139 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import time
+
+from oslo_log import log as logging
+from tempest import config
+
+from trove_tempest_plugin.tests.benchmark import base
+from trove_tempest_plugin.tests import lag
+from trove_tempest_plugin.tests.scenario import base_replication
+from trove_tempest_plugin.tests import workload
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Seconds given to the replicas to catch up between two write rates.
+SETTLE_TIME = 10
+
+
+class TestReplicationLagBenchmarkBase(
+        base.BenchmarkMixin, base_replication.TestReplicationBase):
+    """Measure the replication lag under a steady write load.
+
+    The class instance is the primary, the replicas are created once for
+    all the write rates. Root is used to query the lag on the replicas.
+    """
+    enable_root = True
+
+    @classmethod
+    def create_replicas(cls, count):
+        """Create replicas of the class instance and wait until HEALTHY.
+
+        :returns: {instance id: ip} of the replicas.
+        """
+        replica_ids = []
+        for index in range(count):
+            name = cls.get_resource_name(f"replica-{index + 1:02d}")
+            with cls.span('replica.create', primary_id=cls.instance_id,
+                          operation='create-replica'):
+                replica = cls.create_instance(name,
+                                              replica_of=cls.instance_id,
+                                              create_user=cls.create_user)
+            replica_ids.append(replica['id'])
+
+        replicas = {}
+        for replica_id in replica_ids:
+            cls.wait_for_instance_status(
+                replica_id, expected_op_status=["HEALTHY"],
+                timeout=CONF.database.database_build_timeout * 2)
+            replica = cls.client.get_resource(
+                "instances", replica_id)['instance']
+            replicas[replica_id] = cls.get_instance_ip(replica)
+            cls.wait_for_db_ready(ip=replicas[replica_id])
+        return replicas
+
+    @classmethod
+    def resource_setup(cls):
+        super(TestReplicationLagBenchmarkBase, cls).resource_setup()
+
+        # Same as the replication scenario, the second replica needs more
+        # resources than the gate provides.
+        count = 2 if CONF.database.run_full_tests else 1
+        cls.replicas = cls.create_replicas(count)
+
+    def run_rate(self, rate, duration):
+        """Write at rate writes per second and sample the replica lags."""
+        LOG.info(f"Running replication lag benchmark at {rate} writes per "
+                 f"second for {duration} seconds")
+        primary_url = self.get_root_db_url(self.instance_ip)
+        replica_urls = {replica_id: self.get_root_db_url(ip)
+                        for replica_id, ip in self.replicas.items()}
+
+        wl = workload.Workload(
+            primary_url, connections=CONF.database.workload_connections,
+            qps=rate, write_ratio=1.0, table='lag_workload')
+        monitor = lag.LagMonitor(primary_url, replica_urls)
+        with self.span('benchmark.replication_lag', rate=rate):
+            with monitor, wl:
+                time.sleep(duration)
+
+        series = wl.report()
+        writes = sum(point['writes'] for point in series)
+        errors = sum(point['errors'] for point in series)
+        result = {
+            'target_rate': rate,
+            'rate': writes / max(1, len(series)),
+            'errors': errors,
+            'replicas': monitor.report(),
+        }
+        for replica_id, report in result['replicas'].items():
+            LOG.info(f"Replica {replica_id} at {result['rate']:.0f} writes "
+                     f"per second: marker lag {report['marker_lag']}, "
+                     f"native lag {report['native_lag']}, "
+                     f"{report['unseen']} markers unseen")
+        return result
+
+    @staticmethod
+    def safe_rate(results, max_lag):
+        """Get the highest write rate all the replicas keep up with.
+
+        A replica keeps up if its p99 marker lag is at most max_lag seconds
+        and it has seen all the markers.
+        """
+        safe = None
+        for result in results:
+            for report in result['replicas'].values():
+                p99 = report['marker_lag'].get('p99')
+                if p99 is None or p99 > max_lag or report['unseen']:
+                    return safe
+            safe = result['rate']
+        return safe
+
+    def replication_lag_benchmark_test(self):
+        levels = []
+        for rate in sorted(CONF.database.benchmark_write_rates):
+            levels.append(self.run_rate(rate,
+                                        CONF.database.benchmark_duration))
+            time.sleep(SETTLE_TIME)
+
+        max_lag = CONF.database.benchmark_max_lag
+        results = {
+            'datastore': self.datastore,
+            'replicas': len(self.replicas),
+            'max_lag': max_lag,
+            'safe_rate': self.safe_rate(levels, max_lag),
+            'rates': levels,
+        }
+        LOG.info(f"Highest write rate with a p99 replication lag under "
+                 f"{max_lag}s: {results['safe_rate']}")
+        self.save_results('replication-lag', results)
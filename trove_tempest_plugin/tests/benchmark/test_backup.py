@@ -0,0 +1,69 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+from tempest.lib import decorators
+
+from trove_tempest_plugin.tests.benchmark import base_backup as base
+
+
+class TestBackupBenchmarkMySQL(base.TestBackupBenchmarkBase):
+    datastore = 'mysql'
+
+    @decorators.idempotent_id("badaccbb-5222-46ee-a462-6ff62efe8d88")
+    def test_backup_benchmark(self):
+        self.backup_benchmark_test()
+
+
+class TestCinderBackupBenchmarkMySQL(base.TestBackupBenchmarkBase):
+    datastore = 'mysql'
+    storage_driver = 'cinder'
+
+    @decorators.idempotent_id("a8526411-801b-4791-be0b-0dc05dcd60c6")
+    def test_backup_benchmark(self):
+        self.backup_benchmark_test()
+
+
+class TestBackupBenchmarkMariaDB(base.TestBackupBenchmarkBase):
+    datastore = 'mariadb'
+
+    @decorators.idempotent_id("dd448618-d22d-45f8-8597-bae2613054ce")
+    def test_backup_benchmark(self):
+        self.backup_benchmark_test()
+
+
+class TestCinderBackupBenchmarkMariaDB(base.TestBackupBenchmarkBase):
+    datastore = 'mariadb'
+    storage_driver = 'cinder'
+
+    @decorators.idempotent_id("039eb59e-bd04-479f-a0ad-32d41be215e8")
+    def test_backup_benchmark(self):
+        self.backup_benchmark_test()
+
+
+class TestBackupBenchmarkPostgreSQL(base.TestBackupBenchmarkBase):
+    datastore = 'postgresql'
+    create_user = False
+    enable_root = True
+
+    @decorators.idempotent_id("85fc415b-7b8a-4dd5-ae65-a5562f84dc0f")
+    def test_backup_benchmark(self):
+        self.backup_benchmark_test()
+
+
+class TestCinderBackupBenchmarkPostgreSQL(base.TestBackupBenchmarkBase):
+    datastore = 'postgresql'
+    storage_driver = 'cinder'
+    create_user = False
+    enable_root = True
+
+    @decorators.idempotent_id("ade44261-1d15-4335-aab3-17df716c048c")
+    def test_backup_benchmark(self):
+        self.backup_benchmark_test()
@@ -0,0 +1,38 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+from tempest.lib import decorators
+
+from trove_tempest_plugin.tests.benchmark import base_failover as base
+
+
+class TestFailoverBenchmarkMySQL(base.TestFailoverBenchmarkBase):
+    datastore = 'mysql'
+
+    @decorators.idempotent_id("d71d66fd-c981-4b2d-a037-e5c972cd9f76")
+    def test_failover_benchmark(self):
+        self.failover_benchmark_test()
+
+
+class TestFailoverBenchmarkMariaDB(base.TestFailoverBenchmarkBase):
+    datastore = 'mariadb'
+
+    @decorators.idempotent_id("bbe351c3-fca3-4524-84b9-d681cb33cba0")
+    def test_failover_benchmark(self):
+        self.failover_benchmark_test()
+
+
+class TestFailoverBenchmarkPostgreSQL(base.TestFailoverBenchmarkBase):
+    datastore = 'postgresql'
+
+    @decorators.idempotent_id("384ae554-12c9-453f-9466-69cd84cf3778")
+    def test_failover_benchmark(self):
+        self.failover_benchmark_test()
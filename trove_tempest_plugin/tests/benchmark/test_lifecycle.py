@@ -0,0 +1,38 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+from tempest.lib import decorators
+
+from trove_tempest_plugin.tests.benchmark import base_lifecycle as base
+
+
+class TestLifecycleBenchmarkMySQL(base.TestLifecycleBenchmarkBase):
+    datastore = 'mysql'
+
+    @decorators.idempotent_id("5b0c6a52-8f3e-4d7a-9e1b-2c4f6d8a0b13")
+    def test_lifecycle_benchmark(self):
+        self.lifecycle_benchmark_test()
+
+
+class TestLifecycleBenchmarkMariaDB(base.TestLifecycleBenchmarkBase):
+    datastore = 'mariadb'
+
+    @decorators.idempotent_id("7d2e8c74-1a5b-4f9c-8b3d-4e6a8c0d2f35")
+    def test_lifecycle_benchmark(self):
+        self.lifecycle_benchmark_test()
+
+
+class TestLifecycleBenchmarkPostgreSQL(base.TestLifecycleBenchmarkBase):
+    datastore = 'postgresql'
+
+    @decorators.idempotent_id("9f4a0e96-3c7d-4b1e-ad5f-6a8c0e2b4d57")
+    def test_lifecycle_benchmark(self):
+        self.lifecycle_benchmark_test()
@@ -0,0 +1,40 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+from tempest.lib import decorators
+
+from trove_tempest_plugin.tests.benchmark import base_replication as base
+
+
+class TestReplicationLagBenchmarkMySQL(base.TestReplicationLagBenchmarkBase):
+    datastore = 'mysql'
+
+    @decorators.idempotent_id("0936d707-1ecf-42da-a67a-4406ba44f277")
+    def test_replication_lag_benchmark(self):
+        self.replication_lag_benchmark_test()
+
+
+class TestReplicationLagBenchmarkMariaDB(
+        base.TestReplicationLagBenchmarkBase):
+    datastore = 'mariadb'
+
+    @decorators.idempotent_id("d8a4eeab-32e6-4476-bfa5-62a5eaf34634")
+    def test_replication_lag_benchmark(self):
+        self.replication_lag_benchmark_test()
+
+
+class TestReplicationLagBenchmarkPostgreSQL(
+        base.TestReplicationLagBenchmarkBase):
+    datastore = 'postgresql'
+
+    @decorators.idempotent_id("3b86512a-ead9-4008-abc2-b956c2afaafe")
+    def test_replication_lag_benchmark(self):
+        self.replication_lag_benchmark_test()
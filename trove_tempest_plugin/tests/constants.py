@@ -15,3 +15,8 @@
 DB_USER = 'test_user'
 DB_PASS = 'PassW0rd'
 DB_NAME = 'test_db'
+DB_PORTS = {
+    'mysql': 3306,
+    'mariadb': 3306,
+    'postgresql': 5432,
+}
@@ -0,0 +1,231 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import array
+from concurrent import futures
+import hashlib
+import io
+import math
+import random
+
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_SEED = 20200608
+DEFAULT_TABLE = 'dataset'
+PAYLOAD_LEN = 100
+# Approximate size of a row: BIGINT id, INT val and the payload.
+ROW_SIZE = 8 + 4 + PAYLOAD_LEN
+# The volume holds the dataset plus the indexes, logs, etc.
+VOLUME_OVERHEAD = 2
+
+# The checksum of a key range is the row count plus the sum of the first 60
+# bits of the md5 of every row, which doesn't depend on the row order and can
+# be computed by the server.
+MYSQL_CHECKSUM = (
+    "SELECT COUNT(*), COALESCE(SUM(CAST(CONV(SUBSTRING("
+    "MD5(CONCAT_WS('#', id, val, payload)), 1, 15), 16, 10) AS UNSIGNED)), 0) "
+    "FROM {table} WHERE id BETWEEN :low AND :high;"
+)
+PGSQL_CHECKSUM = (
+    "SELECT count(*), COALESCE(sum(('x' || substr("
+    "md5(concat_ws('#', id, val, payload)), 1, 15))::bit(60)::bigint), 0) "
+    "FROM {table} WHERE id BETWEEN :low AND :high;"
+)
+
+
+def volume_size(size_mb):
+    """Get the volume size in GB of an instance holding size_mb MB of data.
+
+    1GB is kept for the datastore itself.
+    """
+    return math.ceil(size_mb * VOLUME_OVERHEAD / 1024) + 1
+
+
+def row_digest(row):
+    data = "#".join(str(col) for col in row).encode()
+    return int(hashlib.md5(data).hexdigest()[:15], 16)
+
+
+class _CopyReader(io.RawIOBase):
+    """Read-only file object feeding dataset chunks to COPY FROM STDIN."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buf = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            try:
+                self._buf = next(self._chunks)
+            except StopIteration:
+                return 0
+
+        size = min(len(b), len(self._buf))
+        b[:size] = self._buf[:size]
+        self._buf = self._buf[size:]
+        return size
+
+
+class DatasetGenerator(object):
+    """Generate and load a deterministic dataset of a given size.
+
+    The rows are built in chunks, every chunk only depends on the seed and the
+    chunk index, so the same dataset can be rebuilt chunk by chunk later on,
+    e.g. for verification, without keeping it in memory. A dataset of size 0
+    is empty, nothing is loaded or verified.
+    """
+
+    def __init__(self, size_mb, seed=DEFAULT_SEED, table=DEFAULT_TABLE,
+                 chunk_rows=10000):
+        self.size_mb = size_mb
+        self.seed = seed
+        self.table = table
+        self.chunk_rows = chunk_rows
+        self.rows = (max(1, size_mb * 1024 * 1024 // ROW_SIZE)
+                     if size_mb else 0)
+
+    @property
+    def num_chunks(self):
+        return (self.rows + self.chunk_rows - 1) // self.chunk_rows
+
+    def chunk(self, index):
+        """Return the rows of a chunk as a list of (id, val, payload)."""
+        start = index * self.chunk_rows
+        count = min(self.chunk_rows, self.rows - start)
+        rng = random.Random((self.seed << 32) | index)
+
+        # Draw the random bytes for the whole chunk at once instead of row by
+        # row.
+        vals = array.array('i', rng.randbytes(4 * count))
+        payloads = rng.randbytes(count * PAYLOAD_LEN // 2).hex()
+
+        return [
+            (start + i + 1, vals[i],
+             payloads[i * PAYLOAD_LEN:(i + 1) * PAYLOAD_LEN])
+            for i in range(count)
+        ]
+
+    def chunks(self):
+        for index in range(self.num_chunks):
+            yield self.chunk(index)
+
+    def create_table_sql(self):
+        return (f"CREATE TABLE {self.table} (id BIGINT PRIMARY KEY, "
+                f"val INT, payload VARCHAR({PAYLOAD_LEN}));")
+
+    def load_mysql(self, db_client):
+        """Create the dataset table and insert the rows on MySQL/MariaDB.
+
+        Every chunk is sent as an executemany, which PyMySQL turns into
+        multi-row INSERT statements.
+        """
+        if not self.rows:
+            return
+
+        LOG.info(f"Loading {self.rows} rows ({self.size_mb}MB) into table "
+                 f"{self.table}")
+        db_client.mysql_execute(self.create_table_sql())
+        insert = (f"INSERT INTO {self.table} (id, val, payload) "
+                  f"VALUES (:id, :val, :payload)")
+        for rows in self.chunks():
+            params = [{'id': row[0], 'val': row[1], 'payload': row[2]}
+                      for row in rows]
+            db_client.mysql_execute(insert, params=params)
+
+    def load_pgsql(self, db_client):
+        """Create the dataset table and stream the rows on PostgreSQL.
+
+        The rows are streamed with COPY FROM STDIN, chunks are serialized
+        on demand while the server consumes them.
+        """
+        if not self.rows:
+            return
+
+        LOG.info(f"Loading {self.rows} rows ({self.size_mb}MB) into table "
+                 f"{self.table}")
+        db_client.pgsql_execute(self.create_table_sql())
+        chunks = (
+            "".join(f"{row[0]}\t{row[1]}\t{row[2]}\n"
+                    for row in rows).encode()
+            for rows in self.chunks()
+        )
+        db_client.pgsql_copy(
+            f"COPY {self.table} (id, val, payload) FROM STDIN",
+            _CopyReader(chunks))
+
+    def change(self, execute_func, rate):
+        """Update a fraction of the rows, spread across the whole table.
+
+        The payload of every 1/rate-th row is reversed, which keeps the row
+        size unchanged. The dataset doesn't match the checksums anymore.
+
+        :returns: The number of rows changed.
+        """
+        step = max(1, round(1 / rate))
+        LOG.info(f"Changing every {step}th row of table {self.table}")
+        execute_func(f"UPDATE {self.table} SET payload = REVERSE(payload) "
+                     f"WHERE MOD(id, {step}) = 0;")
+        return self.rows // step
+
+    def checksum(self, index):
+        """Return the expected (row count, checksum) of a chunk."""
+        rows = self.chunk(index)
+        return len(rows), sum(row_digest(row) for row in rows)
+
+    def _verify(self, execute_func, checksum_sql, workers):
+        mismatches = []
+        if not self.rows:
+            return mismatches
+
+        ret = execute_func(f"SELECT COUNT(*) FROM {self.table};")
+        count = ret.first()[0]
+        if count != self.rows:
+            mismatches.append(f"table {self.table} has {count} rows, "
+                              f"expected {self.rows}")
+
+        def _check_chunk(index):
+            low = index * self.chunk_rows + 1
+            high = low + self.chunk_rows - 1
+            ret = execute_func(checksum_sql.format(table=self.table),
+                               params={'low': low, 'high': high})
+            actual = tuple(int(col) for col in ret.first())
+            expected = self.checksum(index)
+            if actual != expected:
+                return (f"rows {low}-{high}: (count, checksum) is {actual}, "
+                        f"expected {expected}")
+
+        # Only the chunks being checked are generated on the client side, so
+        # the memory used is bound by the number of workers.
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for ret in executor.map(_check_chunk, range(self.num_chunks)):
+                if ret:
+                    mismatches.append(ret)
+
+        return mismatches
+
+    def verify_mysql(self, db_client, workers=4):
+        """Compare the dataset on MySQL/MariaDB with the expected checksums.
+
+        :returns: A list of mismatch descriptions, empty if the data matches.
+        """
+        return self._verify(db_client.mysql_execute, MYSQL_CHECKSUM, workers)
+
+    def verify_pgsql(self, db_client, workers=4):
+        """Compare the dataset on PostgreSQL with the expected checksums.
+
+        :returns: A list of mismatch descriptions, empty if the data matches.
+        """
+        return self._verify(db_client.pgsql_execute, PGSQL_CHECKSUM, workers)
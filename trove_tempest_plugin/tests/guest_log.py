@@ -0,0 +1,130 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import gzip
+import threading
+
+from oslo_log import log as logging
+from swiftclient import client as swift_client
+
+LOG = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class GuestLogFollower(object):
+    """Follow the guest log of an instance in a background thread.
+
+    The guest log is published periodically and only the parts modified
+    since the last poll are downloaded and appended to a local file, so every
+    poll costs a publish call and a container listing.
+
+    :param instance_id: The ID of the instance.
+    :param publish_func: Called to publish the guest log to swift.
+    :param container_info_func: Returns the (container, prefix, metafile) of
+                                the published guest log.
+    :param swift_cli: A swift client connection only used by the follower.
+    :param path: The local file where the guest log is appended.
+    :param interval: The number of seconds between two polls.
+    """
+
+    def __init__(self, instance_id, publish_func, container_info_func,
+                 swift_cli, path, interval=30, compress=False):
+        self.instance_id = instance_id
+        self.publish_func = publish_func
+        self.container_info_func = container_info_func
+        self.swift_cli = swift_cli
+        self.path = path
+        self.interval = interval
+        self.compress = compress
+        self.lines = 0
+        self.container_info = None
+
+        self._last_seen = ('', '')
+        self._file = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _new_parts(self):
+        if self.container_info is None:
+            self.container_info = self.container_info_func()
+        container, prefix, metafile = self.container_info
+
+        _, parts = self.swift_cli.get_container(
+            container, prefix=prefix, full_listing=True)
+        new_parts = sorted(
+            (part for part in parts
+             if part['name'] != metafile
+             if (part['last_modified'], part['name']) > self._last_seen),
+            key=lambda part: (part['last_modified'], part['name']))
+        return container, new_parts
+
+    def poll(self):
+        """Publish the guest log and append the new parts to the file."""
+        self.publish_func()
+        try:
+            container, new_parts = self._new_parts()
+        except swift_client.ClientException as e:
+            if e.http_status == 404:
+                # Nothing published yet.
+                return 0
+            raise
+
+        lines = 0
+        for part in new_parts:
+            _, body = self.swift_cli.get_object(
+                container, part['name'], resp_chunk_size=CHUNK_SIZE)
+            for chunk in body:
+                self._file.write(chunk)
+                lines += chunk.count(b'\n')
+            self._last_seen = (part['last_modified'], part['name'])
+        self._file.flush()
+
+        if lines:
+            LOG.info(f"Appended {lines} lines of the guest log of instance "
+                     f"{self.instance_id} to {self.path}")
+        self.lines += lines
+        return lines
+
+    def _safe_poll(self):
+        try:
+            self.poll()
+        except Exception as e:
+            LOG.debug(f"Failed to follow the guest log of instance "
+                      f"{self.instance_id}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._safe_poll()
+
+    def start(self):
+        opener = gzip.open if self.compress else open
+        self._file = opener(self.path, 'ab')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, final_poll=True):
+        self._stop.set()
+        self._thread.join()
+        if final_poll:
+            # Get the end of the log.
+            self._safe_poll()
+        self._file.close()
+        self.swift_cli.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Don't publish the log again if waiting failed, the log container
+        # may have been removed already.
+        self.stop(final_poll=exc_type is None)
@@ -0,0 +1,333 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import functools
+import glob
+import os
+import sys
+import threading
+import time
+import zlib
+
+from oslo_serialization import jsonutils as json
+
+_local = threading.local()
+
+
+class Span(object):
+    def __init__(self, name, attributes, parent=None):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.children = []
+        self.events = []
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+        self.thread = threading.current_thread().name
+        self._started = time.monotonic()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, error=None):
+        self.duration = time.monotonic() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'attributes': self.attributes,
+            'start': self.start,
+            'duration': self.duration,
+            'error': self.error,
+            'thread': self.thread,
+            'events': self.events,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+
+class Recorder(object):
+    """Collect the spans of a test or of a test class setup."""
+
+    def __init__(self, name):
+        self.name = name
+        self.spans = []
+        self.pid = os.getpid()
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'pid': self.pid,
+            'spans': [span.to_dict() for span in self.spans],
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+
+def start_recording(name):
+    """Record the spans of the current thread in a new recorder."""
+    recorder = Recorder(name)
+    _local.recorder = recorder
+    _local.stack = []
+    return recorder
+
+
+def stop_recording():
+    recorder = getattr(_local, 'recorder', None)
+    _local.recorder = None
+    _local.stack = []
+    return recorder
+
+
+class _SpanContext(object):
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+
+    def __enter__(self):
+        recorder = getattr(_local, 'recorder', None)
+        stack = getattr(_local, 'stack', None)
+        parent = stack[-1] if stack else None
+        self.span = Span(self.name, self.attributes, parent=parent)
+        if recorder is not None:
+            if parent is not None:
+                parent.children.append(self.span)
+            else:
+                recorder.spans.append(self.span)
+            stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.span.finish(error=exc_val)
+        stack = getattr(_local, 'stack', None)
+        if stack and stack[-1] is self.span:
+            stack.pop()
+
+
+def span(name, **attributes):
+    """Time the code run in context as a span.
+
+    Spans are only recorded while a recorder is active in the current
+    thread, nothing is recorded otherwise. Spans started while another span
+    is running are recorded as its children, e.g.:
+
+        with instrumentation.span('backup.create', instance_id=id):
+            ...
+    """
+    return _SpanContext(name, attributes)
+
+
+class StatusHistory(object):
+    """Timestamped history of the status changes of a resource."""
+
+    def __init__(self):
+        self.transitions = []
+
+    def record(self, status, operating_status=None):
+        """Record the current status, return True if it changed."""
+        if self.transitions:
+            last = self.transitions[-1]
+            if (last['status'], last['operating_status']) == (
+                    status, operating_status):
+                return False
+
+        now = time.time()
+        if self.transitions:
+            self.transitions[-1]['duration'] = (
+                now - self.transitions[-1]['time'])
+        self.transitions.append({
+            'status': status,
+            'operating_status': operating_status,
+            'time': now,
+            'duration': None,
+        })
+        return True
+
+    def __str__(self):
+        states = []
+        for t in self.transitions:
+            state = f"{t['status']}/{t['operating_status']}"
+            if t['duration'] is not None:
+                state += f" ({t['duration']:.0f}s)"
+            states.append(state)
+        return " -> ".join(states)
+
+
+def event(name, **attributes):
+    """Record an instant event, e.g. a poll, in the current span."""
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        stack[-1].events.append(
+            {'name': name, 'time': time.time(), 'attributes': attributes})
+
+
+def traced(name, **attributes):
+    """Decorator timing every call of a function as a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _track_name(recorder_name):
+    # Test IDs are <module>.<class>.<method>[<tags>], the spans of the class
+    # setup and of the tests of a class go to the same track.
+    if '[' in recorder_name or recorder_name.count('.') > 1:
+        name = recorder_name.split('[')[0]
+        module_class, _, method = name.rpartition('.')
+        if method.startswith('test'):
+            return module_class
+    return recorder_name
+
+
+def _span_trace_events(span, pid, tid):
+    args = dict(span['attributes'])
+    if span.get('error'):
+        args['error'] = span['error']
+    events = [{
+        'name': span['name'],
+        'cat': span['name'].split('.')[0],
+        'ph': 'X',
+        'ts': span['start'] * 1e6,
+        'dur': (span['duration'] or 0) * 1e6,
+        'pid': pid,
+        'tid': tid,
+        'args': args,
+    }]
+    for instant in span.get('events', []):
+        events.append({
+            'name': instant['name'],
+            'cat': instant['name'].split('.')[0],
+            'ph': 'i',
+            's': 't',
+            'ts': instant['time'] * 1e6,
+            'pid': pid,
+            'tid': tid,
+            'args': instant['attributes'],
+        })
+    for child in span['children']:
+        events.extend(_span_trace_events(child, pid, tid))
+    return events
+
+
+def to_chrome_trace(recordings):
+    """Convert recorded spans to the Chrome trace event format.
+
+    Every test worker process is a process and every test class a thread
+    in the trace, so that the timeline can be loaded in Perfetto or
+    chrome://tracing.
+
+    :param recordings: Recorder.to_dict() results, e.g. loaded from the
+                       files saved by the tests.
+    """
+    events = []
+    tracks = set()
+    for recording in recordings:
+        pid = recording['pid']
+        track = _track_name(recording['name'])
+        tid = zlib.crc32(track.encode())
+        if (pid, tid) not in tracks:
+            tracks.add((pid, tid))
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': pid,
+                           'args': {'name': f'worker {pid}'}})
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid,
+                           'tid': tid, 'args': {'name': track}})
+        for span in recording['spans']:
+            events.extend(_span_trace_events(span, pid, tid))
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def iter_spans(spans, name=None):
+    """Walk through span dicts and their children."""
+    for span in spans:
+        if name is None or span['name'] == name:
+            yield span
+        yield from iter_spans(span['children'], name=name)
+
+
+# Upper bounds in seconds of the buckets of the status histograms.
+HISTOGRAM_BUCKETS = (5, 10, 30, 60, 120, 300, 600, 1200, float('inf'))
+
+
+def status_histograms(recordings):
+    """Aggregate the time spent in every instance status per datastore.
+
+    The status transitions recorded by the instance status waiters are
+    aggregated in histograms of the time spent in every status and
+    operating status, e.g. {'mysql': {'BUILD/None': {'count': 3, 'total':
+    620.4, 'max': 240.1, 'buckets': {'<=300': 3, ...}}}}.
+    """
+    histograms = {}
+    for recording in recordings:
+        for span in iter_spans(recording['spans'], 'instance.wait_status'):
+            datastore = span['attributes'].get('datastore')
+            for transition in span['attributes'].get('transitions', []):
+                if transition['duration'] is None:
+                    continue
+                state = (f"{transition['status']}/"
+                         f"{transition['operating_status']}")
+                hist = histograms.setdefault(datastore, {}).setdefault(
+                    state, {'count': 0, 'total': 0, 'max': 0,
+                            'buckets': {}})
+                duration = transition['duration']
+                hist['count'] += 1
+                hist['total'] += duration
+                hist['max'] = max(hist['max'], duration)
+                bound = next(b for b in HISTOGRAM_BUCKETS if duration <= b)
+                bucket = f'<={bound}' if bound != float('inf') else 'more'
+                hist['buckets'][bucket] = hist['buckets'].get(bucket, 0) + 1
+    return histograms
+
+
+def load_recordings(spans_dir):
+    recordings = []
+    for path in sorted(glob.glob(os.path.join(spans_dir, '*.json'))):
+        with open(path, 'rb') as f:
+            recordings.append(json.load(f))
+    return recordings
+
+
+def export_chrome_trace(spans_dir, output):
+    """Write the spans saved in spans_dir to a Chrome trace file."""
+    recordings = load_recordings(spans_dir)
+    with open(output, 'w') as f:
+        json.dump(to_chrome_trace(recordings), f)
+    return len(recordings)
+
+
+def export_status_histograms(spans_dir, output):
+    """Write the status histograms of the spans in spans_dir as JSON."""
+    recordings = load_recordings(spans_dir)
+    with open(output, 'w') as f:
+        json.dump(status_histograms(recordings), f, indent=2)
+    return len(recordings)
+
+
+if __name__ == '__main__':
+    # python -m trove_tempest_plugin.tests.instrumentation \
+    #     {trace,histograms} <spans dir> <output file>
+    commands = {
+        'trace': export_chrome_trace,
+        'histograms': export_status_histograms,
+    }
+    if len(sys.argv) != 4 or sys.argv[1] not in commands:
+        sys.exit(f"Usage: {sys.argv[0]} {{trace,histograms}} "
+                 f"<spans directory> <output file>")
+    count = commands[sys.argv[1]](sys.argv[2], sys.argv[3])
+    print(f"Exported {count} recordings to {sys.argv[3]}")
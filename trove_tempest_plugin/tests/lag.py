@@ -0,0 +1,234 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import threading
+import time
+
+from oslo_log import log as logging
+from sqlalchemy import text
+
+from trove_tempest_plugin.tests import utils
+
+LOG = logging.getLogger(__name__)
+
+CREATE_TABLE = {
+    'mysql': "CREATE TABLE IF NOT EXISTS {table} (seq BIGINT PRIMARY KEY);",
+    'postgresql': "CREATE TABLE IF NOT EXISTS {table} "
+                  "(seq BIGINT PRIMARY KEY);",
+}
+
+# The replay lag of a standby is 0 when it has replayed everything it
+# received, otherwise the age of the last replayed transaction.
+PGSQL_LAG = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) "
+    "END;"
+)
+
+
+def native_lag(conn):
+    """Get the lag in seconds reported by the replica itself.
+
+    :returns: The lag, or None if the replica doesn't report it, e.g. when
+              the replication threads are stopped.
+    """
+    if conn.dialect.name == 'postgresql':
+        lag = conn.execute(text(PGSQL_LAG)).scalar()
+        return None if lag is None else float(lag)
+
+    # SHOW REPLICA STATUS is only supported by MySQL 8.0.22+ and MariaDB
+    # 10.5.1+, SHOW SLAVE STATUS is removed from MySQL 8.4.
+    try:
+        row = conn.execute(text("SHOW REPLICA STATUS")).mappings().first()
+    except Exception:
+        row = conn.execute(text("SHOW SLAVE STATUS")).mappings().first()
+    if row is None:
+        return None
+
+    lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+    return None if lag is None else float(lag)
+
+
+class LagMonitor(object):
+    """Sample the replication lag of replicas in background threads.
+
+    The lag is measured in two ways:
+
+    * Write markers: a sequence number is inserted into a marker table on
+      the primary every interval seconds, every replica polls the table and
+      the lag of a marker is the time between its commit on the primary and
+      the first poll seeing it. The poll interval bounds the resolution.
+    * The lag the replicas report themselves, e.g. Seconds_Behind_Source on
+      MySQL, sampled every interval seconds.
+
+    :param primary_url: The SQLAlchemy URL of the primary database.
+    :param replica_urls: {name: SQLAlchemy URL} of the replica databases.
+    :param interval: Seconds between two markers.
+    :param poll_interval: Seconds between two polls of the replicas.
+    """
+
+    def __init__(self, primary_url, replica_urls, interval=1.0,
+                 poll_interval=0.05, table='lag_marker', connect_timeout=2,
+                 query_timeout=5):
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self.table = table
+        self.primary = utils.init_engine(
+            primary_url, connect_args=utils.timeout_connect_args(
+                primary_url, connect_timeout, query_timeout))
+        self.replicas = {
+            name: utils.init_engine(
+                url, connect_args=utils.timeout_connect_args(
+                    url, connect_timeout, query_timeout))
+            for name, url in replica_urls.items()
+        }
+        self.stop_timeout = connect_timeout + query_timeout + 1
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._start = None
+        # The last marker written, and the last one acknowledged.
+        self._seq = 0
+        self._committed = 0
+        # {seq: commit time}
+        self._commits = {}
+        # {replica: [(second, lag), ...]}
+        self.marker_lags = {name: [] for name in self.replicas}
+        self.native_lags = {name: [] for name in self.replicas}
+        self.last_seen = {name: 0 for name in self.replicas}
+
+    def setup(self):
+        sql = CREATE_TABLE[self.primary.dialect.name].format(table=self.table)
+        with self.primary.begin() as conn:
+            conn.execute(text(sql))
+            self._seq = conn.execute(
+                text(f"SELECT COALESCE(MAX(seq), 0) FROM {self.table};")
+            ).scalar()
+        self._committed = self._seq
+        self.last_seen = {name: self._seq for name in self.replicas}
+
+    def _write_markers(self):
+        conn = None
+        while not self._stop.wait(self.interval):
+            try:
+                if conn is None:
+                    conn = self.primary.connect()
+                # A failed marker is skipped, it may have been committed.
+                self._seq += 1
+                with conn.begin():
+                    conn.execute(
+                        text(f"INSERT INTO {self.table} (seq) VALUES (:seq)"),
+                        {'seq': self._seq})
+                with self._lock:
+                    self._commits[self._seq] = time.monotonic()
+                    self._committed = self._seq
+            except Exception as e:
+                LOG.debug(f"Failed to write lag marker: {e}")
+                if conn is not None:
+                    conn.invalidate()
+                    conn.close()
+                    conn = None
+
+        if conn is not None:
+            conn.close()
+
+    def _poll(self, conn, name, next_native):
+        with conn.begin():
+            seq = conn.execute(
+                text(f"SELECT MAX(seq) FROM {self.table};")).scalar() or 0
+        now = time.monotonic()
+
+        with self._lock:
+            # A marker may be seen before its commit time is recorded, it is
+            # handled by the next poll.
+            seen = min(seq, self._committed)
+            commits = [self._commits.get(s)
+                       for s in range(self.last_seen[name] + 1, seen + 1)]
+        for committed in filter(None, commits):
+            self.marker_lags[name].append(
+                (committed - self._start, now - committed))
+        self.last_seen[name] = max(self.last_seen[name], seen)
+
+        if now >= next_native:
+            with conn.begin():
+                lag = native_lag(conn)
+            if lag is not None:
+                self.native_lags[name].append((now - self._start, lag))
+            next_native = now + self.interval
+        return next_native
+
+    def _watch(self, name):
+        engine = self.replicas[name]
+        conn = None
+        next_native = time.monotonic()
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if conn is None:
+                    conn = engine.connect()
+                next_native = self._poll(conn, name, next_native)
+            except Exception as e:
+                LOG.debug(f"Failed to poll replica {name}: {e}")
+                if conn is not None:
+                    conn.invalidate()
+                    conn.close()
+                    conn = None
+
+        if conn is not None:
+            conn.close()
+
+    def start(self):
+        self.setup()
+        self._start = time.monotonic()
+        targets = [(self._write_markers, ())] + [
+            (self._watch, (name,)) for name in self.replicas]
+        for target, args in targets:
+            thread = threading.Thread(target=target, args=args, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            utils.join_thread(thread, self.stop_timeout)
+        self.primary.dispose()
+        for engine in self.replicas.values():
+            engine.dispose()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def report(self):
+        """Return the lag samples and their distribution of every replica.
+
+        Markers not seen by a replica before the monitor stopped are counted
+        as unseen, they are not part of the marker lag distribution.
+        """
+        report = {}
+        for name in self.replicas:
+            marker_lags = [lag for _, lag in self.marker_lags[name]]
+            native_lags = [lag for _, lag in self.native_lags[name]]
+            report[name] = {
+                'markers': len(self._commits),
+                'unseen': sum(1 for seq in self._commits
+                              if seq > self.last_seen[name]),
+                'marker_lag': dict(utils.percentiles(marker_lags),
+                                   max=max(marker_lags, default=None)),
+                'native_lag': dict(utils.percentiles(native_lags),
+                                   max=max(native_lags, default=None)),
+                'marker_samples': self.marker_lags[name],
+                'native_samples': self.native_lags[name],
+            }
+        return report
@@ -49,7 +49,8 @@ class TestInstanceActionsBase(trove_base.BaseTroveTest):
 
         # Initialize database
         LOG.info(f"Initializing data on {cls.instance_ip}")
-        cls.init_db(cls.instance_ip)
+        with cls.span('data.init', instance_id=cls.instance_id):
+            cls.init_db(cls.instance_ip)
 
     def instance_upgrade_test(self):
         cur_version = self.instance['datastore']['version']
@@ -64,35 +65,44 @@ class TestInstanceActionsBase(trove_base.BaseTroveTest):
         name = self.get_resource_name("pre-upgrade")
         LOG.info(f'Creating instance {name} with datastore version '
                  f'{ds_version} for upgrade')
-        instance = self.create_instance(name=name,
-                                        datastore_version=ds_version,
-                                        create_user=self.create_user)
-        self.wait_for_instance_status(instance['id'],
-                                      expected_op_status=["HEALTHY"])
+        with self.span('instance.create', datastore_version=ds_version) \
+                as span:
+            instance = self.create_instance(name=name,
+                                            datastore_version=ds_version,
+                                            create_user=self.create_user)
+            span.set_attribute('instance_id', instance['id'])
+            self.wait_for_instance_status(instance['id'],
+                                          expected_op_status=["HEALTHY"])
         instance = self.client.get_resource(
             "instances", instance['id'])['instance']
         instance_ip = self.get_instance_ip(instance)
 
         # Insert data before upgrading
-        LOG.info(f"Initializing data on {instance_ip} before upgrade")
-        self.init_db(instance_ip)
-        LOG.info(f"Inserting data on {instance_ip} before upgrade")
-        self.insert_data_upgrade(instance_ip)
+        with self.span('data.insert', instance_id=instance['id']):
+            LOG.info(f"Initializing data on {instance_ip} before upgrade")
+            self.init_db(instance_ip)
+            LOG.info(f"Inserting data on {instance_ip} before upgrade")
+            self.insert_data_upgrade(instance_ip)
 
         new_version = cur_version
         LOG.info(f"Upgrading instance {instance['id']} using datastore "
                  f"{new_version}")
         body = {"instance": {"datastore_version": new_version}}
-        self.client.patch_resource('instances', instance['id'], body)
-        self.wait_for_instance_status(instance['id'],
-                                      expected_op_status=["HEALTHY"])
+        with self.span('instance.upgrade', instance_id=instance['id'],
+                       operation='upgrade', datastore_version=new_version), \
+                self.instance_action(instance_ip, 'upgrade'):
+            self.client.patch_resource('instances', instance['id'], body)
+            self.wait_for_instance_status(instance['id'],
+                                          expected_op_status=["HEALTHY"])
+            self.wait_for_db_ready(ip=instance_ip)
 
         LOG.info(f"Getting database version on {instance_ip}")
         actual = self.get_db_version(instance_ip)
         self.assertEqual(new_version, actual)
 
         LOG.info(f"Verifying data on {instance_ip} after upgrade")
-        self.verify_data_upgrade(instance_ip)
+        with self.span('data.verify', instance_id=instance['id']):
+            self.verify_data_upgrade(instance_ip)
 
         # Delete the new instance explicitly to avoid too many instances
         # during the test.
@@ -109,11 +119,17 @@ class TestInstanceActionsBase(trove_base.BaseTroveTest):
                 "flavorRef": CONF.database.resize_flavor_id
             }
         }
-        self.client.create_resource(f"instances/{self.instance_id}/action",
-                                    resize_flavor, expected_status_code=202,
-                                    need_response=False)
-        self.wait_for_instance_status(self.instance_id,
-                                      expected_op_status=["HEALTHY"])
+        with self.span('instance.resize_flavor', instance_id=self.instance_id,
+                       operation='resize-flavor',
+                       flavor_id=CONF.database.resize_flavor_id), \
+                self.instance_action(self.instance_ip, 'resize-flavor'):
+            self.client.create_resource(
+                f"instances/{self.instance_id}/action",
+                resize_flavor, expected_status_code=202,
+                need_response=False)
+            self.wait_for_instance_status(self.instance_id,
+                                          expected_op_status=["HEALTHY"])
+            self.wait_for_db_ready(ip=self.instance_ip)
 
         # Verify Trove flavor
         ret = self.client.get_resource('instances', self.instance_id)
@@ -140,11 +156,16 @@ class TestInstanceActionsBase(trove_base.BaseTroveTest):
                 }
             }
         }
-        self.client.create_resource(f"instances/{self.instance_id}/action",
-                                    resize_volume, expected_status_code=202,
-                                    need_response=False)
-        self.wait_for_instance_status(self.instance_id,
-                                      expected_op_status=["HEALTHY"])
+        with self.span('instance.resize_volume', instance_id=self.instance_id,
+                       operation='resize-volume', size=2), \
+                self.instance_action(self.instance_ip, 'resize-volume'):
+            self.client.create_resource(
+                f"instances/{self.instance_id}/action",
+                resize_volume, expected_status_code=202,
+                need_response=False)
+            self.wait_for_instance_status(self.instance_id,
+                                          expected_op_status=["HEALTHY"])
+            self.wait_for_db_ready(ip=self.instance_ip)
 
         # Verify Trove volume
         ret = self.client.get_resource('instances', self.instance_id)
@@ -152,7 +173,8 @@ class TestInstanceActionsBase(trove_base.BaseTroveTest):
 
     def rebuild_test(self, config_values, config_need_restart=False):
         LOG.info(f"Inserting data on {self.instance_ip} before rebuilding")
-        self.insert_data_before_rebuild(self.instance_ip)
+        with self.span('data.insert', instance_id=self.instance_id):
+            self.insert_data_before_rebuild(self.instance_ip)
 
         # Create configuration before rebuild
         config_name = self.get_resource_name('config')
@@ -166,11 +188,14 @@ class TestInstanceActionsBase(trove_base.BaseTroveTest):
         # Attach the configuration
         LOG.info(f"Attaching config {config_id} to instance "
                  f"{self.instance_id}")
-        self.attach_config(self.instance_id, config_id)
+        with self.span('config.attach', instance_id=self.instance_id,
+                       config_id=config_id):
+            self.attach_config(self.instance_id, config_id)
         self.addCleanup(self.detach_config, self.instance_id)
         if config_need_restart:
             LOG.info(f"Restarting instance {self.instance_id}")
-            self.restart_instance(self.instance_id)
+            with self.instance_action(self.instance_ip, 'restart'):
+                self.restart_instance(self.instance_id)
         # Verify the config before rebuild
         key = list(config_values.keys())[0]
         value = list(config_values.values())[0]
@@ -180,10 +205,13 @@ class TestInstanceActionsBase(trove_base.BaseTroveTest):
 
         LOG.info(f"Rebuilding instance {self.instance_id} with image "
                  f"{CONF.database.rebuild_image_id}")
-        self.rebuild_instance(self.instance_id, CONF.database.rebuild_image_id)
+        with self.instance_action(self.instance_ip, 'rebuild'):
+            self.rebuild_instance(self.instance_id,
+                                  CONF.database.rebuild_image_id)
 
         LOG.info(f"Verifying data on {self.instance_ip} after rebuilding")
-        self.verify_data_after_rebuild(self.instance_ip)
+        with self.span('data.verify', instance_id=self.instance_id):
+            self.verify_data_after_rebuild(self.instance_ip)
 
         # Verify configuration before rebuild
         LOG.info(f"Verifying config {key} on {self.instance_ip} after "
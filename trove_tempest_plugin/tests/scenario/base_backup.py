@@ -15,6 +15,7 @@ from oslo_log import log as logging
 from tempest import config
 
 from trove_tempest_plugin.tests import base as trove_base
+from trove_tempest_plugin.tests import dataset
 
 LOG = logging.getLogger(__name__)
 CONF = config.CONF
@@ -35,6 +36,12 @@ class TestBackupBase(trove_base.BaseTroveTest):
     def verify_data_inc(self, *args, **kwargs):
         pass
 
+    @classmethod
+    def get_volume_size(cls):
+        # The instances hold the dataset loaded before the backups and
+        # replicas are created.
+        return dataset.volume_size(CONF.database.dataset_size)
+
     @classmethod
     def resource_setup(cls):
         super(TestBackupBase, cls).resource_setup()
@@ -45,16 +52,23 @@ class TestBackupBase(trove_base.BaseTroveTest):
         if CONF.database.remove_swift_account:
             cls.addClassResourceCleanup(cls.delete_swift_account)
 
-        # Insert some data to the current db instance
+        # Insert some data to the current db instance, together with a
+        # generated dataset of the configured size.
+        cls.dataset = dataset.DatasetGenerator(CONF.database.dataset_size)
         LOG.info(f"Inserting data on {cls.instance_ip} before creating full"
                  f"backup")
-        cls.insert_data(cls.instance_ip)
+        with cls.span('data.insert', instance_id=cls.instance_id,
+                      dataset_size=CONF.database.dataset_size):
+            cls.insert_data(cls.instance_ip)
 
         # Create a backup that is shared within this test class.
         LOG.info(f"Creating full backup for instance {cls.instance_id}")
         name = cls.get_resource_name("backup")
-        backup = cls.create_backup(cls.instance_id, name)
-        cls.wait_for_backup_status(backup['id'])
+        with cls.span('backup.create', instance_id=cls.instance_id,
+                      operation='backup') as span:
+            backup = cls.create_backup(cls.instance_id, name)
+            span.set_attribute('backup_id', backup['id'])
+            cls.wait_for_backup_status(backup['id'])
         cls.backup = cls.client.get_resource("backups", backup['id'])['backup']
 
     def backup_full_test(self):
@@ -62,16 +76,19 @@ class TestBackupBase(trove_base.BaseTroveTest):
         LOG.info(f'Creating a new instance using the backup '
                  f'{self.backup["id"]}')
         name = self.get_resource_name("restore")
-        restore_instance = self.create_instance(
-            name,
-            datastore_version=self.backup['datastore']['version'],
-            backup_id=self.backup['id'],
-            create_user=self.create_user
-        )
-        self.wait_for_instance_status(
-            restore_instance['id'],
-            expected_op_status=["HEALTHY"],
-            timeout=CONF.database.database_restore_timeout)
+        with self.span('backup.restore', backup_id=self.backup['id'],
+                       operation='restore') as span:
+            restore_instance = self.create_instance(
+                name,
+                datastore_version=self.backup['datastore']['version'],
+                backup_id=self.backup['id'],
+                create_user=self.create_user
+            )
+            span.set_attribute('instance_id', restore_instance['id'])
+            self.wait_for_instance_status(
+                restore_instance['id'],
+                expected_op_status=["HEALTHY"],
+                timeout=CONF.database.database_restore_timeout)
 
         if self.enable_root:
             self.root_password = self.get_root_pass(restore_instance['id'])
@@ -79,9 +96,11 @@ class TestBackupBase(trove_base.BaseTroveTest):
         restore_instance = self.client.get_resource(
             "instances", restore_instance['id'])['instance']
         restore_instance_ip = self.get_instance_ip(restore_instance)
+        self.wait_for_db_ready(ip=restore_instance_ip)
 
         LOG.info(f"Verifying data on restored instance {restore_instance_ip}")
-        self.verify_data(restore_instance_ip)
+        with self.span('data.verify', instance_id=restore_instance['id']):
+            self.verify_data(restore_instance_ip)
 
         # Delete the new instance explicitly to avoid too many instances
         # during the test.
@@ -93,32 +112,39 @@ class TestBackupBase(trove_base.BaseTroveTest):
         # Insert some data
         LOG.info(f"Inserting data on {self.instance_ip} before creating "
                  f"incremental backup")
-        self.insert_data_inc(self.instance_ip)
+        with self.span('data.insert', instance_id=self.instance_id):
+            self.insert_data_inc(self.instance_ip)
 
         # Create a second backup
         LOG.info(f"Creating an incremental backup based on "
                  f"{self.backup['id']}")
         name = self.get_resource_name("backup-inc")
-        backup_inc = self.create_backup(
-            self.instance_id, name, incremental=True,
-            parent_id=self.backup['id']
-        )
-        self.wait_for_backup_status(backup_inc['id'])
+        with self.span('backup.create', instance_id=self.instance_id,
+                       operation='incremental-backup') as span:
+            backup_inc = self.create_backup(
+                self.instance_id, name, incremental=True,
+                parent_id=self.backup['id']
+            )
+            span.set_attribute('backup_id', backup_inc['id'])
+            self.wait_for_backup_status(backup_inc['id'])
 
         # Restore from backup
         LOG.info(f"Creating a new instance using the backup "
                  f"{backup_inc['id']}")
         name = self.get_resource_name("restore-inc")
-        restore_instance = self.create_instance(
-            name,
-            datastore_version=backup_inc['datastore']['version'],
-            backup_id=backup_inc['id'],
-            create_user=self.create_user
-        )
-        self.wait_for_instance_status(
-            restore_instance['id'],
-            expected_op_status=["HEALTHY"],
-            timeout=CONF.database.database_restore_timeout)
+        with self.span('backup.restore', backup_id=backup_inc['id'],
+                       operation='incremental-restore') as span:
+            restore_instance = self.create_instance(
+                name,
+                datastore_version=backup_inc['datastore']['version'],
+                backup_id=backup_inc['id'],
+                create_user=self.create_user
+            )
+            span.set_attribute('instance_id', restore_instance['id'])
+            self.wait_for_instance_status(
+                restore_instance['id'],
+                expected_op_status=["HEALTHY"],
+                timeout=CONF.database.database_restore_timeout)
 
         if self.enable_root:
             self.root_password = self.get_root_pass(restore_instance['id'])
@@ -126,11 +152,13 @@ class TestBackupBase(trove_base.BaseTroveTest):
         restore_instance = self.client.get_resource(
             "instances", restore_instance['id'])['instance']
         restore_instance_ip = self.get_instance_ip(restore_instance)
+        self.wait_for_db_ready(ip=restore_instance_ip)
 
         LOG.info(f"Verifying data on {restore_instance_ip}"
                  f"({restore_instance['id']}) after restoring incremental "
                  f"backup")
-        self.verify_data_inc(restore_instance_ip)
+        with self.span('data.verify', instance_id=restore_instance['id']):
+            self.verify_data_inc(restore_instance_ip)
 
         # Delete the new instance explicitly to avoid too many instances
         # during the test.
@@ -58,11 +58,16 @@ class TestInstanceBasicBase(trove_base.BaseTroveTest):
         # Attach the configuration to the existing instance
         LOG.info(f"Attaching config {config_id} to instance "
                  f"{self.instance_id}")
-        self.attach_config(self.instance_id, config_id)
+        with self.span('config.attach', instance_id=self.instance_id,
+                       config_id=config_id,
+                       operation='configuration-attach'), \
+                self.probe_availability(self.instance_ip,
+                                        'configuration-attach'):
+            self.attach_config(self.instance_id, config_id)
 
-        if need_restart:
-            LOG.info(f"Restarting instance {self.instance_id}")
-            self.restart_instance(self.instance_id)
+            if need_restart:
+                LOG.info(f"Restarting instance {self.instance_id}")
+                self.restart_instance(self.instance_id)
 
         ret = self.client.list_resources(
             f"configurations/{config_id}/instances")
@@ -83,8 +88,10 @@ class TestInstanceBasicBase(trove_base.BaseTroveTest):
             }
         }
         LOG.info(f"Updating config {config_id}")
-        self.client.patch_resource('configurations', config_id, patch_config,
-                                   expected_status_code=200)
+        with self.span('config.update', instance_id=self.instance_id,
+                       config_id=config_id):
+            self.client.patch_resource('configurations', config_id,
+                                       patch_config, expected_status_code=200)
 
         if need_restart:
             LOG.info(f"Restarting instance {self.instance_id}")
@@ -96,7 +103,9 @@ class TestInstanceBasicBase(trove_base.BaseTroveTest):
 
         # Detach the configuration from the instance
         LOG.info(f"Detaching from instance {self.instance_id}")
-        self.detach_config(self.instance_id)
+        with self.span('config.detach', instance_id=self.instance_id,
+                       config_id=config_id):
+            self.detach_config(self.instance_id)
 
         if need_restart:
             LOG.info(f"Restarting instance {self.instance_id}")
@@ -36,15 +36,19 @@ class TestCinderBackupBase(trove_base.BaseTroveTest):
         # Insert some data to the current db instance
         LOG.info(f"Inserting data on {cls.instance_ip} before creating"
                  f"backup")
-        cls.insert_data(cls.instance_ip)
+        with cls.span('data.insert', instance_id=cls.instance_id):
+            cls.insert_data(cls.instance_ip)
 
         # Create a backup that is shared within this test class.
         LOG.info(f"Creating backup for instance {cls.instance_id}")
         name = cls.get_resource_name("backup")
-        backup = cls.create_backup(cls.instance_id,
-                                   name,
-                                   storage_driver="cinder")
-        cls.wait_for_backup_status(backup['id'])
+        with cls.span('backup.create', instance_id=cls.instance_id,
+                      operation='backup', storage_driver='cinder') as span:
+            backup = cls.create_backup(cls.instance_id,
+                                       name,
+                                       storage_driver="cinder")
+            span.set_attribute('backup_id', backup['id'])
+            cls.wait_for_backup_status(backup['id'])
         cls.backup = cls.client.get_resource("backups", backup['id'])['backup']
 
     def backup_test(self):
@@ -52,16 +56,19 @@ class TestCinderBackupBase(trove_base.BaseTroveTest):
         LOG.info(f'Creating a new instance using the backup '
                  f'{self.backup["id"]}')
         name = self.get_resource_name("restore")
-        restore_instance = self.create_instance(
-            name,
-            datastore_version=self.backup['datastore']['version'],
-            backup_id=self.backup['id'],
-            create_user=self.create_user
-        )
-        self.wait_for_instance_status(
-            restore_instance['id'],
-            expected_op_status=["HEALTHY"],
-            timeout=CONF.database.database_restore_timeout)
+        with self.span('backup.restore', backup_id=self.backup['id'],
+                       operation='restore', storage_driver='cinder') as span:
+            restore_instance = self.create_instance(
+                name,
+                datastore_version=self.backup['datastore']['version'],
+                backup_id=self.backup['id'],
+                create_user=self.create_user
+            )
+            span.set_attribute('instance_id', restore_instance['id'])
+            self.wait_for_instance_status(
+                restore_instance['id'],
+                expected_op_status=["HEALTHY"],
+                timeout=CONF.database.database_restore_timeout)
 
         if self.enable_root:
             self.root_password = self.get_root_pass(restore_instance['id'])
@@ -69,9 +76,11 @@ class TestCinderBackupBase(trove_base.BaseTroveTest):
         restore_instance = self.client.get_resource(
             "instances", restore_instance['id'])['instance']
         restore_instance_ip = self.get_instance_ip(restore_instance)
+        self.wait_for_db_ready(ip=restore_instance_ip)
 
         LOG.info(f"Verifying data on restored instance {restore_instance_ip}")
-        self.verify_data(restore_instance_ip)
+        with self.span('data.verify', instance_id=restore_instance['id']):
+            self.verify_data(restore_instance_ip)
 
         # Delete the new instance explicitly to avoid too many instances
         # during the test.
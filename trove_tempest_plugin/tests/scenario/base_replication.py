@@ -17,6 +17,7 @@ from oslo_log import log as logging
 from tempest import config
 
 from trove_tempest_plugin.tests import base as trove_base
+from trove_tempest_plugin.tests import dataset
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
@@ -38,24 +39,43 @@ class TestReplicationBase(trove_base.BaseTroveTest):
     def create_database(self, name, **kwargs):
         pass
 
+    @classmethod
+    def get_volume_size(cls):
+        # The instances hold the dataset loaded before the backups and
+        # replicas are created.
+        return dataset.volume_size(CONF.database.dataset_size)
+
+    @classmethod
+    def resource_setup(cls):
+        super(TestReplicationBase, cls).resource_setup()
+
+        # Dataset inserted on the primary and verified on the replicas.
+        cls.dataset = dataset.DatasetGenerator(CONF.database.dataset_size)
+
     def replication_test(self):
         # Insert data for primary
         LOG.info(f"Inserting data before creating replicas on "
                  f"{self.instance_ip}")
-        self.insert_data_replication(self.instance_ip)
+        with self.span('data.insert', instance_id=self.instance_id,
+                       dataset_size=CONF.database.dataset_size):
+            self.insert_data_replication(self.instance_ip)
 
         # Create replica1
         LOG.info(f"Creating replica1 for instance {self.instance_id}")
         name = self.get_resource_name("replica-01")
-        replica1 = self.create_instance(name, replica_of=self.instance_id,
-                                        create_user=self.create_user)
-        replica1_id = replica1['id']
-        self.addCleanup(self.wait_for_instance_status, replica1_id,
-                        need_delete=True, expected_status='DELETED')
-        self.wait_for_instance_status(
-            replica1_id,
-            expected_op_status=["HEALTHY"],
-            timeout=CONF.database.database_build_timeout * 2)
+        with self.span('replica.create', primary_id=self.instance_id,
+                       operation='create-replica') as span:
+            replica1 = self.create_instance(name,
+                                            replica_of=self.instance_id,
+                                            create_user=self.create_user)
+            replica1_id = replica1['id']
+            span.set_attribute('instance_id', replica1_id)
+            self.addCleanup(self.wait_for_instance_status, replica1_id,
+                            need_delete=True, expected_status='DELETED')
+            self.wait_for_instance_status(
+                replica1_id,
+                expected_op_status=["HEALTHY"],
+                timeout=CONF.database.database_build_timeout * 2)
         replica1 = self.client.get_resource(
             "instances", replica1_id)['instance']
         replica1_ip = self.get_instance_ip(replica1)
@@ -106,15 +126,19 @@ class TestReplicationBase(trove_base.BaseTroveTest):
         # Create replica2
         LOG.info(f"Creating replica2 for instance {self.instance_id}")
         name = self.get_resource_name("replica-02")
-        replica2 = self.create_instance(name, replica_of=self.instance_id,
-                                        create_user=self.create_user)
-        replica2_id = replica2['id']
-        self.addCleanup(self.wait_for_instance_status, replica2_id,
-                        need_delete=True, expected_status='DELETED')
-        self.wait_for_instance_status(
-            replica2_id,
-            expected_op_status=["HEALTHY"],
-            timeout=CONF.database.database_build_timeout * 2)
+        with self.span('replica.create', primary_id=self.instance_id,
+                       operation='create-replica') as span:
+            replica2 = self.create_instance(name,
+                                            replica_of=self.instance_id,
+                                            create_user=self.create_user)
+            replica2_id = replica2['id']
+            span.set_attribute('instance_id', replica2_id)
+            self.addCleanup(self.wait_for_instance_status, replica2_id,
+                            need_delete=True, expected_status='DELETED')
+            self.wait_for_instance_status(
+                replica2_id,
+                expected_op_status=["HEALTHY"],
+                timeout=CONF.database.database_build_timeout * 2)
         replica2 = self.client.get_resource(
             "instances", replica2_id)['instance']
         replica2_ip = self.get_instance_ip(replica2)
@@ -137,8 +161,10 @@ class TestReplicationBase(trove_base.BaseTroveTest):
 
         # Verify data synchronization on replica1 and replica2
         LOG.info(f"Verifying data on replicas {replica1_ip} and {replica2_ip}")
-        self.verify_data_replication(replica1_ip)
-        self.verify_data_replication(replica2_ip)
+        with self.span('data.verify', instance_id=replica1_id):
+            self.verify_data_replication(replica1_ip)
+        with self.span('data.verify', instance_id=replica2_id):
+            self.verify_data_replication(replica2_ip)
 
         # Volume resize to primary
         LOG.info(f"Resizing volume for primary {self.instance_id} to 2G")
@@ -147,15 +173,19 @@ class TestReplicationBase(trove_base.BaseTroveTest):
                 "volume": {"size": 2}
             }
         }
-        self.client.create_resource(f"instances/{self.instance_id}/action",
-                                    req_body, expected_status_code=202,
-                                    need_response=False)
-        self.wait_for_instance_status(self.instance_id,
-                                      expected_op_status=["HEALTHY"])
-        self.wait_for_instance_status(replica1_id,
-                                      expected_op_status=["HEALTHY"])
-        self.wait_for_instance_status(replica2_id,
-                                      expected_op_status=["HEALTHY"])
+        with self.span('instance.resize_volume', instance_id=self.instance_id,
+                       operation='resize-volume', size=2):
+            with self.instance_action(self.instance_ip, 'resize-volume'):
+                self.client.create_resource(
+                    f"instances/{self.instance_id}/action",
+                    req_body, expected_status_code=202,
+                    need_response=False)
+                self.wait_for_instance_status(self.instance_id,
+                                              expected_op_status=["HEALTHY"])
+            self.wait_for_instance_status(replica1_id,
+                                          expected_op_status=["HEALTHY"])
+            self.wait_for_instance_status(replica2_id,
+                                          expected_op_status=["HEALTHY"])
 
         # Verify the volumes of all the replicas are also resized to 2G
         replica1 = self.client.get_resource('instances', replica1_id)
@@ -168,11 +198,15 @@ class TestReplicationBase(trove_base.BaseTroveTest):
         promote_primary = {
             "promote_to_replica_source": {}
         }
-        self.client.create_resource(f"instances/{replica1_id}/action",
-                                    promote_primary, expected_status_code=202,
-                                    need_response=False)
-        self.wait_for_instance_status(replica1_id,
-                                      expected_op_status=["HEALTHY"])
+        with self.span('replica.promote', instance_id=replica1_id,
+                       operation='promote'), \
+                self.probe_availability(replica1_ip, 'promote'):
+            self.client.create_resource(
+                f"instances/{replica1_id}/action",
+                promote_primary, expected_status_code=202,
+                need_response=False)
+            self.wait_for_instance_status(replica1_id,
+                                          expected_op_status=["HEALTHY"])
 
         # Make sure to delete replicas first for clean up, in case failure
         # happens when replica1 is still the primary.
@@ -196,12 +230,15 @@ class TestReplicationBase(trove_base.BaseTroveTest):
 
         # Insert data to new primary and verify in replicas
         LOG.info(f"Inserting data on new primary {replica1_ip}")
-        self.insert_data_after_promote(replica1_ip)
+        with self.span('data.insert', instance_id=replica1_id):
+            self.insert_data_after_promote(replica1_ip)
         time.sleep(5)
         LOG.info(f"Verifying data on new replicas {self.instance_ip} and "
                  f"{replica2_ip}")
-        self.verify_data_after_promote(self.instance_ip)
-        self.verify_data_after_promote(replica2_ip)
+        with self.span('data.verify', instance_id=self.instance_id):
+            self.verify_data_after_promote(self.instance_ip)
+        with self.span('data.verify', instance_id=replica2_id):
+            self.verify_data_after_promote(replica2_ip)
 
         # Detach original primary from the replication cluster
         LOG.info(f"Detaching replica {self.instance_id} from the replication "
@@ -211,10 +248,12 @@ class TestReplicationBase(trove_base.BaseTroveTest):
                 "replica_of": ""
             }
         }
-        self.client.put_resource(f'/instances/{self.instance_id}',
-                                 detach_replica)
-        self.wait_for_instance_status(self.instance_id,
-                                      expected_op_status=["HEALTHY"])
+        with self.span('replica.detach', instance_id=self.instance_id,
+                       operation='detach-replica'):
+            self.client.put_resource(f'/instances/{self.instance_id}',
+                                     detach_replica)
+            self.wait_for_instance_status(self.instance_id,
+                                          expected_op_status=["HEALTHY"])
 
         # Verify original primary
         ret = self.client.get_resource('instances', self.instance_id)
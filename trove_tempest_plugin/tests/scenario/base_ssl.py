@@ -14,16 +14,19 @@
 
 import abc
 import base64
+from concurrent import futures
 import os
 import pymysql
 import ssl
 import tempfile
 import testtools
+import time
 
 from oslo_log import log as logging
 from tempest import config
 from tempest.lib import decorators
 from tempest.lib import exceptions
+from testtools import content
 from trove_tempest_plugin.tests import base as trove_base
 from trove_tempest_plugin.tests import constants
 from trove_tempest_plugin.tests import utils
@@ -31,6 +34,9 @@ from trove_tempest_plugin.tests import utils
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Number of concurrent barbican calls when creating or deleting secrets.
+SECRET_WORKERS = 4
+
 
 class TestInstanceSSLBase(trove_base.BaseTroveTest):
     def assertPlainConnection(self, ip):
@@ -61,30 +67,58 @@ class TestInstanceSSLBase(trove_base.BaseTroveTest):
         pass
 
     @classmethod
-    def _create_secret(cls, p12, password=None):
-        if password:
-            name = 'p12-container-with-password'
-        else:
-            name = 'p12-container-passwordless'
-
-        secret = cls.secret_client.create_secret(
-            expected_status=201,
-            name=cls.get_resource_name(name),
-            algorithm='aes', mode='cbc', bit_length=256,
-            secret_type='certificate',
-            payload=base64.b64encode(p12['p12_payload']),
-            payload_content_type="application/octet-stream",
-            payload_content_encoding="base64"
-        )
-        p12['container_ref'] = secret['secret_ref']
-        LOG.info('Secret created: %s', p12['container_ref'])
+    def _timed_secret_call(cls, func, *args, **kwargs):
+        start = time.monotonic()
+        ret = func(*args, **kwargs)
+        LOG.info(f"Barbican {func.__name__} took "
+                 f"{time.monotonic() - start:.3f}s")
+        return ret
+
+    @classmethod
+    def _delete_secrets(cls, secret_refs):
+        """Delete barbican secrets concurrently."""
+        with futures.ThreadPoolExecutor(
+                max_workers=SECRET_WORKERS) as executor:
+            list(executor.map(
+                lambda ref: cls._timed_secret_call(
+                    cls.secret_client.delete_secret,
+                    cls.secret_client.ref_to_uuid(ref)),
+                secret_refs))
+
+    @classmethod
+    def _create_secrets(cls, bundles):
+        """Store PKCS#12 bundles and their passwords in barbican.
+
+        All the secrets are created concurrently and deleted together in a
+        single class cleanup.
+
+        :param bundles: A list of (p12, password) tuples, password may be
+                        None.
+        :returns: The list of p12 dicts.
+        """
+        def _create_p12(p12, password):
+            if password:
+                name = 'p12-container-with-password'
+            else:
+                name = 'p12-container-passwordless'
 
-        cls.addClassResourceCleanup(cls.secret_client.delete_secret,
-                                    cls.secret_client.ref_to_uuid(
-                                        p12['container_ref']))
+            secret = cls._timed_secret_call(
+                cls.secret_client.create_secret,
+                expected_status=201,
+                name=cls.get_resource_name(name),
+                algorithm='aes', mode='cbc', bit_length=256,
+                secret_type='certificate',
+                payload=base64.b64encode(p12['p12_payload']),
+                payload_content_type="application/octet-stream",
+                payload_content_encoding="base64"
+            )
+            p12['container_ref'] = secret['secret_ref']
+            LOG.info('Secret created: %s', p12['container_ref'])
+            return p12['container_ref']
 
-        if password:
-            pw_secret = cls.secret_client.create_secret(
+        def _create_password(p12, password):
+            pw_secret = cls._timed_secret_call(
+                cls.secret_client.create_secret,
                 expected_status=201,
                 name=cls.get_resource_name('password-for-p12'),
                 secret_type='passphrase',
@@ -93,18 +127,38 @@ class TestInstanceSSLBase(trove_base.BaseTroveTest):
             )
             p12['password_ref'] = pw_secret['secret_ref']
             LOG.info('Secret for password created: %s', p12['password_ref'])
-            cls.addClassResourceCleanup(cls.secret_client.delete_secret,
-                                        cls.secret_client.ref_to_uuid(
-                                            p12['password_ref']))
-
-        # The resulting dict contains:
+            return p12['password_ref']
+
+        with futures.ThreadPoolExecutor(
+                max_workers=SECRET_WORKERS) as executor:
+            calls = []
+            for p12, password in bundles:
+                calls.append(executor.submit(_create_p12, p12, password))
+                if password:
+                    calls.append(
+                        executor.submit(_create_password, p12, password))
+            futures.wait(calls)
+
+        # Register the cleanup of the secrets which were created even if
+        # some of the calls failed.
+        secret_refs = [call.result() for call in calls
+                       if call.exception() is None]
+        cls.addClassResourceCleanup(cls._delete_secrets, secret_refs)
+        for call in calls:
+            call.result()
+
+        # Every resulting dict contains:
         # - key: <plain string private key for certificate>
         # - cert: <plain string certificate contents>
         # - cas: [<single-item array with ca plain string>]
         # - p12_payload: <binary data for p12 container>
         # - container_ref: <secret ref to p12 container in barbican>
         # - password_ref: <secret ref to password in barbican, if present>
-        return p12
+        return [p12 for p12, _ in bundles]
+
+    @classmethod
+    def _create_secret(cls, p12, password=None):
+        return cls._create_secrets([(p12, password)])[0]
 
     def _get_consumers(cls, container_ref):
         secret_uuid = cls.secret_client.ref_to_uuid(container_ref)
@@ -114,46 +168,98 @@ class TestInstanceSSLBase(trove_base.BaseTroveTest):
         )
         return resp.get('consumers', resp)
 
-    def _find_consumers(cls, consumers, resource_type, resource_id):
-        resource_id = str(resource_id)
-        return [
-            c for c in consumers
-            if c.get('resource_type') == resource_type
-            if str(c.get('resource_id')) == resource_id
-        ]
+    def _index_consumers(cls, consumers):
+        return {
+            (c.get('resource_type'), str(c.get('resource_id')))
+            for c in consumers
+        }
+
+    def wait_for_consumer(self, container_ref, resource_type, resource_id,
+                          present=True):
+        """Poll the consumers of a secret until one is added or removed.
+
+        Consumers are registered asynchronously, the consumer list is polled
+        with an exponential backoff. The time it took for the consumer to
+        appear or disappear is attached to the test as a detail.
+
+        :returns: The latency in seconds.
+        """
+        key = (resource_type, str(resource_id))
+        timeout = CONF.database.consumer_wait_timeout
+        interval = 0.25
+        start = time.monotonic()
+
+        while True:
+            consumers = self._get_consumers(container_ref)
+            latency = time.monotonic() - start
+            if (key in self._index_consumers(consumers)) == present:
+                break
+            if latency >= timeout:
+                state = "not found" if present else "still present"
+                self.fail(f"Consumer {state} after {timeout} seconds: "
+                          f"type={resource_type}, id={resource_id}, "
+                          f"actual={consumers}")
+            time.sleep(min(interval, timeout - latency))
+            interval = min(interval * 2, 5)
+
+        action = "registered" if present else "removed"
+        LOG.info(f"Consumer {resource_type} {resource_id} {action} after "
+                 f"{latency:.3f} seconds")
+        self.consumer_latencies.append({
+            'resource_type': resource_type,
+            'resource_id': str(resource_id),
+            'action': action,
+            'latency': latency,
+        })
+        self.addDetail('consumer-latencies',
+                       content.json_content(self.consumer_latencies))
+        return latency
 
     def assertConsumer(cls, container_ref, resource_type, resource_id):
-        consumers = cls._get_consumers(container_ref)
-        matches = cls._find_consumers(consumers, resource_type, resource_id)
-        cls.assertTrue(
-            matches,
-            (f"Consumer not found: type={resource_type}, "
-             f"id={resource_id}, actual={consumers}")
-        )
+        cls.wait_for_consumer(container_ref, resource_type, resource_id)
 
     def assertNoConsumer(cls, container_ref, resource_type, resource_id):
-        consumers = cls._get_consumers(container_ref)
-        matches = cls._find_consumers(consumers, resource_type, resource_id)
-        cls.assertFalse(
-            matches,
-            (f"Unexpected consumer found: type={resource_type}, "
-             f"id={resource_id}, actual={consumers}")
-        )
+        cls.wait_for_consumer(container_ref, resource_type, resource_id,
+                              present=False)
+
+    def setUp(self):
+        super(TestInstanceSSLBase, self).setUp()
+        self.consumer_latencies = []
 
     @classmethod
     def resource_setup(cls):
+        # Start generating the certificate keys in the background while the
+        # instance is being created.
+        key_type = CONF.database.ssl_key_type
+        utils.enable_key_pool(CONF.database.ssl_key_pool_size,
+                              key_type=key_type)
+        cls.addClassResourceCleanup(utils.disable_key_pool)
+
         super(TestInstanceSSLBase, cls).resource_setup()
 
         cls.secret_client = cls.os_primary.secret_v1.SecretClient()
         cls.consumer_client = cls.os_primary.secret_v1_1.SecretConsumerClient()
 
-        cls.p12 = cls._create_secret(utils.generate_p12(
-            cls.instance_ip, client_name=constants.DB_USER))
-        cls.p12_with_pass = cls._create_secret(
-            utils.generate_p12(
-                cls.instance_ip, constants.DB_PASS,
-                client_name=constants.DB_USER),
-            constants.DB_PASS)
+        ca = ca_with_pass = None
+        if CONF.database.reuse_test_ca:
+            # The two certificates still need different CAs, the tests check
+            # that the CA of one certificate doesn't validate the other one.
+            ca = utils.get_shared_ca('default', key_type=key_type)
+            ca_with_pass = utils.get_shared_ca('with-password',
+                                               key_type=key_type)
+
+        cache_dir = CONF.database.ssl_cert_cache_dir
+        p12, p12_with_pass = utils.generate_p12_many([
+            {'cn': cls.instance_ip, 'client_name': constants.DB_USER,
+             'ca': ca, 'cache_dir': cache_dir, 'key_type': key_type},
+            {'cn': cls.instance_ip, 'p12_pass': constants.DB_PASS,
+             'client_name': constants.DB_USER, 'ca': ca_with_pass,
+             'cache_dir': cache_dir, 'key_type': key_type},
+        ])
+        cls.p12, cls.p12_with_pass = cls._create_secrets([
+            (p12, None),
+            (p12_with_pass, constants.DB_PASS),
+        ])
 
     @decorators.idempotent_id("f2dfb7ec-2898-4fa1-b6e2-9d7d56d98ef4")
     def test_ssl_basic(self):
@@ -161,12 +267,15 @@ class TestInstanceSSLBase(trove_base.BaseTroveTest):
         request = {'ssl': {
             'enable': True,
             'container_ref': self.p12['container_ref']}}
-        response = self.client.create_resource(
-            f"instances/{self.instance_id}/ssl",
-            request, expected_status_code=200)
-        if response['ssl']['restart_required']:
-            LOG.info(f"Restarting instance {self.instance_id}")
-            self.restart_instance(self.instance_id)
+        with self.span('ssl.enable', instance_id=self.instance_id,
+                       operation='ssl-enable'), \
+                self.probe_availability(self.instance_ip, 'ssl-enable'):
+            response = self.client.create_resource(
+                f"instances/{self.instance_id}/ssl",
+                request, expected_status_code=200)
+            if response['ssl']['restart_required']:
+                LOG.info(f"Restarting instance {self.instance_id}")
+                self.restart_instance(self.instance_id)
 
         self.assertConsumer(
             self.p12['container_ref'], 'instance', self.instance_id)
@@ -631,7 +740,9 @@ class TestInstanceSSLBase(trove_base.BaseTroveTest):
         # Create new certificate with multi-ip SAN
         replication_p12 = self._create_secret(utils.generate_p12(
             [self.instance_ip, replica_ip],
-            client_name=constants.DB_USER))
+            client_name=constants.DB_USER,
+            cache_dir=CONF.database.ssl_cert_cache_dir,
+            key_type=CONF.database.ssl_key_type))
         request = {'ssl': {
             'enable': True,
             'mode': 'mtls',
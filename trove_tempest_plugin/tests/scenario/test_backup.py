@@ -31,7 +31,8 @@ class TestBackupMySQL(base_backup.TestBackupBase):
                 "CREATE TABLE Persons (ID int, String varchar(255));",
                 "insert into Persons VALUES (1, 'Lingxian Kong');",
             ]
-            db_client.mysql_execute(cmds)
+            db_client.mysql_execute(cmds, batch=True)
+            cls.dataset.load_mysql(db_client)
 
     @classmethod
     def insert_data_inc(cls, ip, username=constants.DB_USER,
@@ -52,6 +53,8 @@ class TestBackupMySQL(base_backup.TestBackupBase):
             ret = db_client.mysql_execute(cmd)
             keys = ret.keys()
             rows = ret.fetchall()
+            mismatches = self.dataset.verify_mysql(db_client)
+        self.assertEqual([], mismatches)
         self.assertEqual(1, len(rows))
 
         result = dict(zip(keys, rows[0]))
@@ -67,6 +70,8 @@ class TestBackupMySQL(base_backup.TestBackupBase):
             ret = db_client.mysql_execute(cmd)
             keys = ret.keys()
             rows = ret.fetchall()
+            mismatches = self.dataset.verify_mysql(db_client)
+        self.assertEqual([], mismatches)
         self.assertEqual(2, len(rows))
 
         actual = []
@@ -110,7 +115,8 @@ class TestBackupPostgreSQL(base_backup.TestBackupBase):
                 "string VARCHAR(255));",
                 "INSERT INTO persons (id,string) VALUES (1, 'Lingxian Kong');",
             ]
-            db_client.pgsql_execute(cmds)
+            db_client.pgsql_execute(cmds, batch=True)
+            cls.dataset.load_pgsql(db_client)
 
     @classmethod
     def insert_data_inc(cls, ip):
@@ -130,6 +136,8 @@ class TestBackupPostgreSQL(base_backup.TestBackupBase):
             ret = db_client.pgsql_execute(cmd)
             keys = ret.keys()
             rows = ret.fetchall()
+            mismatches = self.dataset.verify_pgsql(db_client)
+        self.assertEqual([], mismatches)
         self.assertEqual(1, len(rows))
 
         result = dict(zip(keys, rows[0]))
@@ -146,6 +154,8 @@ class TestBackupPostgreSQL(base_backup.TestBackupBase):
             ret = db_client.pgsql_execute(cmd)
             keys = ret.keys()
             rows = ret.fetchall()
+            mismatches = self.dataset.verify_pgsql(db_client)
+        self.assertEqual([], mismatches)
         self.assertEqual(2, len(rows))
 
         actual = []
@@ -72,7 +72,7 @@ class InstanceActionsMySQLBase(base_actions.TestInstanceActionsBase):
                 "CREATE TABLE Rebuild (ID int, String varchar(255));",
                 "insert into Rebuild VALUES (1, 'rebuild-data');"
             ]
-            db_client.mysql_execute(cmds)
+            db_client.mysql_execute(cmds, batch=True)
 
     def verify_data_after_rebuild(self, ip,
                                   username=constants.DB_USER,
@@ -208,7 +208,7 @@ class TestInstanceActionsPostgreSQL(base_actions.TestInstanceActionsBase):
                 "CREATE TABLE Rebuild (ID int, String varchar(255));",
                 "insert into Rebuild VALUES (1, 'rebuild-data');"
             ]
-            db_client.pgsql_execute(cmds)
+            db_client.pgsql_execute(cmds, batch=True)
 
     def verify_data_after_rebuild(self, ip):
         db_url = (f'postgresql+psycopg2://root:{self.password}@'
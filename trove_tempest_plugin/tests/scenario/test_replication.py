@@ -31,7 +31,8 @@ class TestReplicationMySQL(base_replication.TestReplicationBase):
                 "CREATE TABLE Persons (ID int, String varchar(255));",
                 "insert into Persons VALUES (1, 'replication');"
             ]
-            db_client.mysql_execute(cmds)
+            db_client.mysql_execute(cmds, batch=True)
+            self.dataset.load_mysql(db_client)
 
     def verify_data_replication(self, ip,
                                 username=constants.DB_USER,
@@ -43,6 +44,8 @@ class TestReplicationMySQL(base_replication.TestReplicationBase):
             ret = db_client.mysql_execute(cmd)
             keys = ret.keys()
             rows = ret.fetchall()
+            mismatches = self.dataset.verify_mysql(db_client)
+        self.assertEqual([], mismatches)
         self.assertEqual(1, len(rows))
 
         result = []
@@ -72,6 +75,8 @@ class TestReplicationMySQL(base_replication.TestReplicationBase):
             ret = db_client.mysql_execute(cmd)
             keys = ret.keys()
             rows = ret.fetchall()
+            mismatches = self.dataset.verify_mysql(db_client)
+        self.assertEqual([], mismatches)
         self.assertGreater(len(rows), 1)
 
         result = []
@@ -111,7 +116,8 @@ class TestReplicationPostgreSQL(base_replication.TestReplicationBase):
                 "CREATE TABLE Persons (ID int, String varchar(255));",
                 "insert into Persons VALUES (1, 'replication');"
             ]
-            db_client.pgsql_execute(cmds)
+            db_client.pgsql_execute(cmds, batch=True)
+            self.dataset.load_pgsql(db_client)
 
     def verify_data_replication(self, ip):
         db_url = (f'postgresql+psycopg2://root:{self.password}@'
@@ -122,6 +128,8 @@ class TestReplicationPostgreSQL(base_replication.TestReplicationBase):
             ret = db_client.pgsql_execute(cmd)
             keys = ret.keys()
             rows = ret.fetchall()
+            mismatches = self.dataset.verify_pgsql(db_client)
+        self.assertEqual([], mismatches)
         self.assertEqual(1, len(rows))
 
         result = []
@@ -148,6 +156,8 @@ class TestReplicationPostgreSQL(base_replication.TestReplicationBase):
             ret = db_client.pgsql_execute(cmd)
             keys = ret.keys()
             rows = ret.fetchall()
+            mismatches = self.dataset.verify_pgsql(db_client)
+        self.assertEqual([], mismatches)
         self.assertGreater(len(rows), 1)
 
         result = []
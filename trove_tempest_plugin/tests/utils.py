@@ -11,9 +11,20 @@
 #    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
+import base64
+import collections
+from concurrent import futures
+import hashlib
 import ipaddress
+import itertools
+import math
+import os
+import socket
+import struct
+import threading
 import time
 
+from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives import serialization
@@ -22,13 +33,19 @@ from cryptography import x509
 from cryptography.x509.oid import NameOID
 from datetime import datetime
 from datetime import timedelta
+from datetime import timezone
 
 from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from pymysql.constants import CLIENT
 import sqlalchemy
 from sqlalchemy import text
 from tempest.lib import exceptions
 
+from trove_tempest_plugin.tests import constants
+from trove_tempest_plugin.tests import instrumentation
+
 LOG = logging.getLogger(__name__)
 
 
@@ -63,27 +80,209 @@ def wait_for_removal(delete_func, show_func, *args, **kwargs):
         time.sleep(3)
 
 
+def percentiles(values, pcts=(50, 95, 99)):
+    """Return the nearest-rank percentiles of values as {'p50': x, ...}."""
+    if not values:
+        return {}
+
+    values = sorted(values)
+    return {
+        f'p{pct}': values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+        for pct in pcts
+    }
+
+
+def _prefetch_results(executor, func, items, pending):
+    try:
+        while pending:
+            result = pending.popleft().result()
+            for item in items:
+                pending.append(executor.submit(func, item))
+                break
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def prefetch_map(executor, func, items, window):
+    """Like executor.map() but with at most window calls in flight.
+
+    The first window calls are submitted right away, the next ones as the
+    results are consumed. Results are yielded in the order of items, the
+    remaining calls are cancelled when the generator is closed early.
+    """
+    items = iter(items)
+    pending = collections.deque(executor.submit(func, item)
+                                for item in itertools.islice(items, window))
+    return _prefetch_results(executor, func, items, pending)
+
+
+def _recv_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('Connection closed by server')
+        data += chunk
+    return data
+
+
+def _mysql_greeting_ok(sock):
+    # The server speaks first with the initial handshake packet: 3 bytes
+    # payload length, 1 byte sequence id, then the protocol version (10). An
+    # error packet (0xff) is sent instead if the server can't accept the
+    # connection yet.
+    header = _recv_exact(sock, 4)
+    return _recv_exact(sock, 1) == b'\x0a' and header[3] == 0
+
+
+def _pgsql_greeting_ok(sock):
+    # Send a protocol 3.0 StartupMessage, a ready server replies with an
+    # authentication request ('R'). An error ('E') with SQLSTATE 57P03
+    # (cannot_connect_now) means the server is still starting up, any other
+    # error, e.g. rejected by pg_hba.conf, comes from a running server.
+    params = b'user\x00root\x00database\x00postgres\x00\x00'
+    sock.sendall(struct.pack('!ii', len(params) + 8, 196608) + params)
+    msg_type = _recv_exact(sock, 1)
+    if msg_type == b'R':
+        return True
+    if msg_type == b'E':
+        length = struct.unpack('!i', _recv_exact(sock, 4))[0]
+        return b'C57P03\x00' not in _recv_exact(sock, length - 4)
+    return False
+
+
+def check_db_ready(ip, datastore, timeout=2):
+    """Check if the database server accepts connections.
+
+    Open a TCP connection to the datastore port and check the protocol
+    greeting of the server.
+    """
+    port = constants.DB_PORTS[datastore]
+    try:
+        with socket.create_connection((ip, port), timeout=timeout) as sock:
+            if datastore == 'postgresql':
+                return _pgsql_greeting_ok(sock)
+            return _mysql_greeting_ok(sock)
+    except OSError:
+        return False
+
+
+def wait_for_db_ready(ip, datastore, timeout=120, interval=0.5):
+    """Wait until the database server accepts connections.
+
+    :returns: The number of seconds it took for the server to become ready.
+    :raises TimeoutException: The server was not ready in timeout seconds.
+    """
+    start = time.monotonic()
+    while True:
+        # Keep the connect timeout short so that a single attempt against a
+        # port where packets are dropped doesn't use up the whole timeout.
+        ready = check_db_ready(ip, datastore, timeout=min(2, timeout))
+        instrumentation.event('database.probe', ip=ip, ready=ready)
+        if ready:
+            return time.monotonic() - start
+
+        if time.monotonic() - start >= timeout:
+            message = (f'Database on {ip}:{constants.DB_PORTS[datastore]} '
+                       f'is not ready in {timeout} seconds.')
+            raise exceptions.TimeoutException(message)
+        time.sleep(interval)
+
+
 def init_engine(db_url, connect_args={}):
     return sqlalchemy.create_engine(db_url, connect_args=connect_args)
 
 
+def timeout_connect_args(db_url, connect_timeout, query_timeout):
+    """Get the connection arguments bounding how long a query can block.
+
+    Without them, a query in flight when the instance is powered off, e.g.
+    during a resize, blocks until the TCP retransmissions give up, which
+    takes about 15 minutes.
+    """
+    if db_url.startswith('mysql'):
+        return {
+            'connect_timeout': connect_timeout,
+            'read_timeout': query_timeout,
+            'write_timeout': query_timeout,
+        }
+
+    # libpq has no read timeout, unacknowledged data is bounded by
+    # tcp_user_timeout and an idle connection by the keepalives.
+    return {
+        'connect_timeout': connect_timeout,
+        'keepalives': 1,
+        'keepalives_idle': query_timeout,
+        'keepalives_interval': 1,
+        'keepalives_count': 3,
+        'tcp_user_timeout': query_timeout * 1000,
+    }
+
+
+def join_thread(thread, timeout):
+    """Wait for a thread to finish, return False if it doesn't in time."""
+    thread.join(timeout)
+    if thread.is_alive():
+        LOG.warning(f"Thread {thread.name} didn't stop in {timeout} "
+                    f"seconds")
+        return False
+    return True
+
+
 class SQLClient(object):
     def __init__(self, conn_str, connect_args={}):
+        if conn_str.startswith('mysql'):
+            # Allow a list of statements to be sent in a single request, see
+            # batch_execute(). FOUND_ROWS is what SQLAlchemy sets by default.
+            connect_args = dict(connect_args)
+            connect_args.setdefault(
+                'client_flag', CLIENT.MULTI_STATEMENTS | CLIENT.FOUND_ROWS)
         self.engine = init_engine(conn_str, connect_args=connect_args)
 
-    def conn_execute(self, conn, cmds):
+    def conn_execute(self, conn, cmds, params=None, batch=False):
+        """Execute one or more SQL statements on the given connection.
+
+        :param cmds: A single SQL statement or a list of statements.
+        :param params: Bind parameters for a single statement. A list of
+                       parameter dicts runs the statement once per set in
+                       executemany style, e.g. for inserting many rows.
+        :param batch: Send a list of statements in one round trip instead of
+                      one round trip per statement.
+        """
         if isinstance(cmds, str):
-            result = conn.execute(text(cmds))
-            return result
+            if params is None:
+                return conn.execute(text(cmds))
+            return conn.execute(text(cmds), params)
+
+        if batch:
+            return self.batch_execute(conn, cmds)
 
         for cmd in cmds:
             conn.execute(text(cmd))
 
+    def batch_execute(self, conn, cmds):
+        """Send a list of statements as one multi-statement request."""
+        sql = "\n".join(cmd.strip().rstrip(';') + ';' for cmd in cmds)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(sql)
+            if conn.dialect.name == 'mysql':
+                # Walk through every result set so that errors in later
+                # statements are raised here and the connection is left in
+                # a clean state.
+                while cursor.nextset():
+                    pass
+        finally:
+            cursor.close()
+
     def pgsql_execute(self, cmds, **kwargs):
         try:
-            with self.engine.connect() as conn:
+            with instrumentation.span('sql.execute', dialect='postgresql'), \
+                    self.engine.connect() as conn:
                 conn.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-                return self.conn_execute(conn, cmds)
+                return self.conn_execute(conn, cmds, **kwargs)
         except Exception as e:
             raise exceptions.TempestException(
                 'Failed to execute database command %s, error: %s' %
@@ -92,14 +291,50 @@ class SQLClient(object):
 
     def mysql_execute(self, cmds, **kwargs):
         try:
-            with self.engine.begin() as conn:
-                return self.conn_execute(conn, cmds)
+            with instrumentation.span('sql.execute', dialect='mysql'), \
+                    self.engine.begin() as conn:
+                return self.conn_execute(conn, cmds, **kwargs)
         except Exception as e:
             raise exceptions.TempestException(
                 'Failed to execute database command %s, error: %s' %
                 (cmds, str(e))
             )
 
+    def stream(self, cmd, params=None, batch_size=1000):
+        """Yield the rows returned by a query in lists of batch_size rows.
+
+        The query runs on an unbuffered cursor for MySQL (SSCursor) and a
+        named server-side cursor for PostgreSQL, so only one batch of rows is
+        held in memory at a time whatever the size of the result.
+        """
+        try:
+            with self.engine.connect() as conn:
+                conn = conn.execution_options(stream_results=True,
+                                              max_row_buffer=batch_size)
+                result = self.conn_execute(conn, cmd, params=params)
+                for rows in result.partitions(batch_size):
+                    yield rows
+        except Exception as e:
+            raise exceptions.TempestException(
+                'Failed to execute database command %s, error: %s' %
+                (cmd, str(e))
+            )
+
+    def pgsql_copy(self, sql, fileobj, size=1024 * 1024):
+        """Run COPY ... FROM STDIN, streaming the data from fileobj."""
+        try:
+            with self.engine.begin() as conn:
+                cursor = conn.connection.cursor()
+                try:
+                    cursor.copy_expert(sql, fileobj, size=size)
+                finally:
+                    cursor.close()
+        except Exception as e:
+            raise exceptions.TempestException(
+                'Failed to execute database command %s, error: %s' %
+                (sql, str(e))
+            )
+
     def __enter__(self):
         return self
 
@@ -107,17 +342,195 @@ class SQLClient(object):
         self.engine.dispose()
 
 
-# Generate self-signed PKCS12 container with a private key, ca and certificate
-# signed by ca. May be password-protected if p12_pass is provided.
-def generate_p12(cn, p12_pass=None, client_name="client"):
-    # Generate CA key
-    ca_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
+class AvailabilityProbe(object):
+    """Record the time windows in which a database is unreachable.
+
+    A background thread runs "SELECT 1" every interval_ms milliseconds on a
+    dedicated connection, which is re-opened after a failure. The windows are
+    (start, end) seconds relative to the probe start, from the first failed
+    query to the next successful one.
+    """
+
+    def __init__(self, db_url, interval_ms=100, connect_timeout=1,
+                 query_timeout=5):
+        self.engine = init_engine(
+            db_url, connect_args=timeout_connect_args(
+                db_url, connect_timeout, query_timeout))
+        self.stop_timeout = connect_timeout + query_timeout + 1
+        self.interval = interval_ms / 1000
+        self.windows = []
+        self._down_since = None
+        self._start = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _probe(self, conn):
+        if conn is None:
+            conn = self.engine.connect()
+        with conn.begin():
+            conn.execute(text("SELECT 1")).fetchall()
+        return conn
+
+    def _run(self):
+        conn = None
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                conn = self._probe(conn)
+                if self._down_since is not None:
+                    self.windows.append(
+                        (self._down_since, started - self._start))
+                    self._down_since = None
+            except Exception:
+                if self._down_since is None:
+                    self._down_since = started - self._start
+                if conn is not None:
+                    try:
+                        conn.invalidate()
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+
+            self._stop.wait(
+                max(0, self.interval - (time.monotonic() - started)))
+
+        if conn is not None:
+            conn.close()
+
+    @property
+    def downtime(self):
+        return sum(end - start for start, end in self.windows)
+
+    def start(self):
+        self._start = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        join_thread(self._thread, self.stop_timeout)
+        # Close the window of a database still unreachable at the end.
+        if self._down_since is not None:
+            self.windows.append(
+                (self._down_since, time.monotonic() - self._start))
+            self._down_since = None
+        self.engine.dispose()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+DEFAULT_KEY_TYPE = 'rsa2048'
+_EC_CURVES = {
+    'ec-p256': ec.SECP256R1,
+    'ec-p384': ec.SECP384R1,
+}
+KEY_TYPES = ('rsa2048', 'rsa3072', 'rsa4096') + tuple(_EC_CURVES)
+
+
+def _new_private_key(key_type=DEFAULT_KEY_TYPE):
+    if key_type in _EC_CURVES:
+        return ec.generate_private_key(_EC_CURVES[key_type]())
+    if key_type in KEY_TYPES:
+        return rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=int(key_type[3:]),
+        )
+    raise ValueError(f"Unsupported key type {key_type}, supported types "
+                     f"are {', '.join(KEY_TYPES)}")
+
+
+def _generate_key_pem(key_type=DEFAULT_KEY_TYPE):
+    key = _new_private_key(key_type)
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
     )
 
+
+class KeyPool(object):
+    """Private keys generated ahead of time in background processes.
+
+    The pool keeps size keys of every key type being generated or ready,
+    every key taken from the pool schedules the generation of a new one. Keys
+    of the given key type are generated right away, keys of other types when
+    the first one is requested. The keys are generated on up to size cores.
+    """
+
+    def __init__(self, size, key_type=DEFAULT_KEY_TYPE):
+        self._size = size
+        self._executor = futures.ProcessPoolExecutor(
+            max_workers=min(size, os.cpu_count() or 1))
+        self._lock = threading.Lock()
+        self._keys = {}
+        with self._lock:
+            self._fill(key_type)
+
+    def _fill(self, key_type):
+        if key_type not in self._keys:
+            self._keys[key_type] = collections.deque(
+                self._executor.submit(_generate_key_pem, key_type)
+                for _ in range(self._size))
+        return self._keys[key_type]
+
+    def get(self, key_type=DEFAULT_KEY_TYPE):
+        with self._lock:
+            keys = self._fill(key_type)
+            future = keys.popleft()
+            keys.append(self._executor.submit(_generate_key_pem, key_type))
+        return serialization.load_pem_private_key(
+            future.result(), password=None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_key_pool = None
+_shared_cas = {}
+_shared_cas_lock = threading.Lock()
+
+
+def enable_key_pool(size, key_type=DEFAULT_KEY_TYPE):
+    """Generate the private keys for test certificates in the background.
+
+    The pool is shared by all the tests running in the current process, it's
+    only created once until disable_key_pool() is called.
+    """
+    global _key_pool
+    if _key_pool is None and size > 0:
+        _key_pool = KeyPool(size, key_type=key_type)
+
+
+def disable_key_pool():
+    """Stop the key pool, the pending key generations are cancelled.
+
+    Otherwise the interpreter waits for all the queued keys at exit.
+    """
+    global _key_pool
+    if _key_pool is not None:
+        _key_pool.shutdown()
+        _key_pool = None
+
+
+def _generate_key(key_type=DEFAULT_KEY_TYPE):
+    if _key_pool is not None:
+        return _key_pool.get(key_type)
+
+    return _new_private_key(key_type)
+
+
+def generate_ca(name="Trove Test CA", key_type=DEFAULT_KEY_TYPE):
+    """Generate a self-signed CA, return the key and the certificate."""
+    ca_key = _generate_key(key_type)
+
     ca_subject = x509.Name([
-        x509.NameAttribute(NameOID.COMMON_NAME, "Trove Test CA"),
+        x509.NameAttribute(NameOID.COMMON_NAME, name),
     ])
 
     ca_cert = (
@@ -135,11 +548,104 @@ def generate_p12(cn, p12_pass=None, client_name="client"):
         .sign(ca_key, hashes.SHA256())
     )
 
+    return ca_key, ca_cert
+
+
+def get_shared_ca(name, key_type=DEFAULT_KEY_TYPE):
+    """Get a CA generated once and reused for the whole test run.
+
+    CAs with different names are different, so tests needing certificates
+    which don't trust each other can still share CAs with other tests.
+    """
+    with _shared_cas_lock:
+        if (name, key_type) not in _shared_cas:
+            _shared_cas[(name, key_type)] = generate_ca(
+                f"Trove Test CA {name}", key_type=key_type)
+        return _shared_cas[(name, key_type)]
+
+
+def _cert_not_valid_after(cert):
+    try:
+        return cert.not_valid_after_utc
+    except AttributeError:
+        # cryptography < 42
+        return cert.not_valid_after.replace(tzinfo=timezone.utc)
+
+
+def _p12_cache_path(cache_dir, cn, p12_pass, client_name, key_type):
+    ips = cn if isinstance(cn, list) else [cn]
+    key = {
+        'ips': sorted(ips),
+        'client_name': client_name,
+        'password': (hashlib.sha256(p12_pass.encode()).hexdigest()
+                     if p12_pass else None),
+        'key_type': key_type,
+    }
+    digest = hashlib.sha256(
+        json.dumps(key, sort_keys=True).encode()).hexdigest()
+    return os.path.join(cache_dir, f'{digest}.json')
+
+
+def _generate_p12_cached(cache_dir, cn, p12_pass=None, client_name="client",
+                         ca=None, key_type=DEFAULT_KEY_TYPE):
+    """Get a bundle from the on-disk cache, generate it on a miss.
+
+    Bundles are cached by the SAN IP addresses, the client name, the
+    password and the key type, and regenerated one day before they expire.
+    A cached bundle keeps the CA it was generated with.
+    """
+    path = _p12_cache_path(cache_dir, cn, p12_pass, client_name, key_type)
+    try:
+        with open(path, 'rb') as f:
+            cached = json.load(f)
+        expires = datetime.fromtimestamp(cached['expires'], timezone.utc)
+        if expires - timedelta(days=1) > datetime.now(timezone.utc):
+            bundle = cached['bundle']
+            bundle['p12_payload'] = base64.b64decode(bundle['p12_payload'])
+            LOG.info(f"Using cached certificate bundle {path}")
+            return bundle
+    except (OSError, ValueError, KeyError):
+        pass
+
+    bundle = generate_p12(cn, p12_pass=p12_pass, client_name=client_name,
+                          ca=ca, key_type=key_type)
+    cert = x509.load_pem_x509_certificate(bundle['cert'].encode())
+    cached = {
+        'expires': _cert_not_valid_after(cert).timestamp(),
+        'bundle': dict(
+            bundle,
+            p12_payload=base64.b64encode(bundle['p12_payload']).decode()),
+    }
+
+    # Write to a temporary file first so that concurrent test workers never
+    # read a partial file.
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(cached, f)
+    os.replace(tmp_path, path)
+    return bundle
+
+
+# Generate self-signed PKCS12 container with a private key, ca and certificate
+# signed by ca. May be password-protected if p12_pass is provided. A new CA is
+# generated unless the key and certificate of a CA are given in ca. Bundles
+# are cached on disk if cache_dir is provided. key_type is one of KEY_TYPES
+# and applies to the generated CA, server and client keys.
+def generate_p12(cn, p12_pass=None, client_name="client", ca=None,
+                 cache_dir=None, key_type=DEFAULT_KEY_TYPE):
+    if cache_dir:
+        return _generate_p12_cached(cache_dir, cn, p12_pass=p12_pass,
+                                    client_name=client_name, ca=ca,
+                                    key_type=key_type)
+
+    if ca:
+        ca_key, ca_cert = ca
+    else:
+        ca_key, ca_cert = generate_ca(key_type=key_type)
+
     # Generate server key
-    server_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-    )
+    server_key = _generate_key(key_type)
 
     if isinstance(cn, list):
         ips = cn
@@ -207,7 +713,7 @@ def generate_p12(cn, p12_pass=None, client_name="client"):
     )
 
     client_key_pem, client_cert_pem = generate_client_cert(
-        ca_key, ca_cert, client_name=client_name)
+        ca_key, ca_cert, client_name=client_name, key_type=key_type)
 
     return {
         "key": key_pem,
@@ -219,11 +725,60 @@ def generate_p12(cn, p12_pass=None, client_name="client"):
     }
 
 
-def generate_client_cert(ca_key, ca_cert, client_name="client"):
-    client_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-    )
+def _init_p12_worker():
+    # The key pool of the parent process can't be used from a forked worker.
+    global _key_pool
+    _key_pool = None
+
+
+def _generate_p12_from_spec(spec):
+    spec = dict(spec)
+    if spec.get('ca'):
+        key_pem, cert_pem = spec['ca']
+        spec['ca'] = (serialization.load_pem_private_key(key_pem, None),
+                      x509.load_pem_x509_certificate(cert_pem))
+    return generate_p12(**spec)
+
+
+def generate_p12_many(specs, max_workers=None):
+    """Generate several PKCS#12 bundles in parallel.
+
+    The bundles are generated in a pool of processes so that the key
+    generation runs on all the available cores. When the key pool is enabled
+    the keys are generated by the pool, which already runs on all the
+    available cores, only the signing is done in the current process.
+
+    :param specs: A list of dicts with the keyword arguments of
+                  generate_p12().
+    :returns: The list of bundles, in the same order as specs.
+    """
+    max_workers = max_workers or min(len(specs), os.cpu_count() or 1)
+    if _key_pool is not None or max_workers < 2:
+        return [generate_p12(**spec) for spec in specs]
+
+    # Keys and certificates can't be pickled, pass the CAs as PEM.
+    serialized = []
+    for spec in specs:
+        spec = dict(spec)
+        if spec.get('ca'):
+            ca_key, ca_cert = spec['ca']
+            spec['ca'] = (
+                ca_key.private_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PrivateFormat.PKCS8,
+                    encryption_algorithm=serialization.NoEncryption()),
+                ca_cert.public_bytes(encoding=serialization.Encoding.PEM))
+        serialized.append(spec)
+
+    with futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_p12_worker) as executor:
+        return list(executor.map(_generate_p12_from_spec, serialized))
+
+
+def generate_client_cert(ca_key, ca_cert, client_name="client",
+                         key_type=DEFAULT_KEY_TYPE):
+    client_key = _generate_key(key_type)
 
     subject = x509.Name([
         x509.NameAttribute(NameOID.COMMON_NAME, client_name),
@@ -0,0 +1,290 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+import collections
+import random
+import threading
+import time
+
+from oslo_log import log as logging
+from sqlalchemy import text
+
+from trove_tempest_plugin.tests import utils
+
+LOG = logging.getLogger(__name__)
+
+CREATE_TABLE = {
+    'mysql': "CREATE TABLE IF NOT EXISTS {table} "
+             "(id INT AUTO_INCREMENT PRIMARY KEY, val VARCHAR(64));",
+    'postgresql': "CREATE TABLE IF NOT EXISTS {table} "
+                  "(id SERIAL PRIMARY KEY, val VARCHAR(64));",
+}
+
+
+class Workload(object):
+    """Run an OLTP-like workload against a database in background threads.
+
+    Every worker thread uses its own connection and reconnects when a query
+    fails, so the workload keeps running while the instance is restarted,
+    resized, etc. Query latencies and errors are collected per second.
+
+    :param db_url: The SQLAlchemy URL of the database.
+    :param connections: Number of worker threads/connections.
+    :param qps: Target number of queries per second for all the workers, 0
+                means as fast as possible.
+    :param write_ratio: Fraction of the queries that are writes.
+    """
+
+    def __init__(self, db_url, connections=4, qps=50, write_ratio=0.2,
+                 table='workload', connect_timeout=2, query_timeout=10):
+        self.connections = connections
+        self.qps = qps
+        self.write_ratio = write_ratio
+        self.table = table
+        self.engine = utils.init_engine(
+            db_url, connect_args=utils.timeout_connect_args(
+                db_url, connect_timeout, query_timeout))
+        self.stop_timeout = connect_timeout + query_timeout + 1
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        # {second: {'latencies': [...], 'reads': n, 'writes': n, 'errors': n}}
+        self._buckets = collections.defaultdict(
+            lambda: {'latencies': [], 'reads': 0, 'writes': 0, 'errors': 0})
+        self._start = None
+        self._max_id = 0
+
+    def setup(self):
+        sql = CREATE_TABLE[self.engine.dialect.name].format(table=self.table)
+        with self.engine.begin() as conn:
+            conn.execute(text(sql))
+            conn.execute(text(f"INSERT INTO {self.table} (val) "
+                              f"VALUES ('workload');"))
+            self._max_id = conn.execute(
+                text(f"SELECT MAX(id) FROM {self.table};")).scalar()
+
+    def _record(self, started, latency, op):
+        second = int(started - self._start)
+        with self._lock:
+            bucket = self._buckets[second]
+            if op == 'error':
+                bucket['errors'] += 1
+            else:
+                bucket[op] += 1
+                bucket['latencies'].append(latency)
+
+    def _query(self, conn, rng):
+        if rng.random() < self.write_ratio:
+            with conn.begin():
+                conn.execute(
+                    text(f"INSERT INTO {self.table} (val) VALUES (:val)"),
+                    {'val': f'{rng.getrandbits(64):x}'})
+            return 'writes'
+
+        with conn.begin():
+            conn.execute(
+                text(f"SELECT val FROM {self.table} WHERE id = :id"),
+                {'id': rng.randint(1, max(1, self._max_id))}).fetchall()
+        return 'reads'
+
+    def _worker(self, index):
+        rng = random.Random(index)
+        interval = self.connections / self.qps if self.qps else 0
+        next_run = time.monotonic()
+        conn = None
+
+        while not self._stop.is_set():
+            if interval:
+                next_run += interval
+                delay = next_run - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    # Don't try to catch up after an outage.
+                    next_run = time.monotonic()
+
+            started = time.monotonic()
+            try:
+                if conn is None:
+                    conn = self.engine.connect()
+                op = self._query(conn, rng)
+                self._record(started, time.monotonic() - started, op)
+            except Exception as e:
+                LOG.debug(f"Workload query failed: {e}")
+                self._record(started, time.monotonic() - started, 'error')
+                if conn is not None:
+                    try:
+                        conn.invalidate()
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+                self._stop.wait(0.1)
+
+        if conn is not None:
+            conn.close()
+
+    def start(self):
+        self.setup()
+        self._start = time.monotonic()
+        for index in range(self.connections):
+            thread = threading.Thread(target=self._worker, args=(index,),
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            utils.join_thread(thread, self.stop_timeout)
+        self.engine.dispose()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def report(self):
+        """Return the throughput and latencies as a per second time series.
+
+        Latencies are in milliseconds, seconds without any successful query
+        have no latency percentiles.
+        """
+        with self._lock:
+            buckets = dict(self._buckets)
+
+        series = []
+        last = max(buckets) if buckets else -1
+        for second in range(last + 1):
+            bucket = buckets.get(second, {'latencies': [], 'reads': 0,
+                                          'writes': 0, 'errors': 0})
+            point = {
+                'second': second,
+                'reads': bucket['reads'],
+                'writes': bucket['writes'],
+                'errors': bucket['errors'],
+            }
+            latencies = [lat * 1000 for lat in bucket['latencies']]
+            point.update(utils.percentiles(latencies))
+            series.append(point)
+        return series
+
+
+CREATE_ACKED_TABLE = (
+    "CREATE TABLE IF NOT EXISTS {table} "
+    "(writer VARCHAR(32), seq BIGINT, PRIMARY KEY (writer, seq));"
+)
+
+
+class AckedWriter(object):
+    """Write sequence numbers and record the acknowledged ones.
+
+    A background thread inserts increasing sequence numbers into a table,
+    a sequence number is acknowledged once its commit returned. The writer
+    keeps retrying while the database doesn't accept writes, e.g. while a
+    replica is being promoted, so it can tell when writes are accepted and
+    which acknowledged writes are missing afterwards.
+
+    :param db_url: The SQLAlchemy URL of the database.
+    :param name: The name of the writer, stored with its sequence numbers.
+    :param interval: Seconds between two writes.
+    """
+
+    def __init__(self, db_url, name, interval=0.01, table='acked_writes',
+                 connect_timeout=1, query_timeout=5):
+        self.name = name
+        self.interval = interval
+        self.table = table
+        self.connect_args = utils.timeout_connect_args(
+            db_url, connect_timeout, query_timeout)
+        self.engine = utils.init_engine(db_url,
+                                        connect_args=self.connect_args)
+        self.stop_timeout = connect_timeout + query_timeout + 1
+        # [(seq, time)] of the acknowledged writes.
+        self.acked = []
+        self.errors = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    def setup(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(CREATE_ACKED_TABLE.format(table=self.table)))
+
+    @property
+    def first_ack(self):
+        """Seconds from the start to the first acknowledged write."""
+        return self.acked[0][1] if self.acked else None
+
+    @property
+    def last_ack(self):
+        return self.acked[-1][1] if self.acked else None
+
+    def _run(self):
+        seq = 0
+        conn = None
+        while not self._stop.is_set():
+            seq += 1
+            try:
+                if conn is None:
+                    conn = self.engine.connect()
+                with conn.begin():
+                    conn.execute(
+                        text(f"INSERT INTO {self.table} (writer, seq) "
+                             f"VALUES (:writer, :seq)"),
+                        {'writer': self.name, 'seq': seq})
+                self.acked.append((seq, time.monotonic() - self._start))
+            except Exception as e:
+                LOG.debug(f"Write {seq} of {self.name} failed: {e}")
+                self.errors += 1
+                if conn is not None:
+                    try:
+                        conn.invalidate()
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+            self._stop.wait(self.interval)
+
+        if conn is not None:
+            conn.close()
+
+    def start(self, start=None):
+        """Start writing.
+
+        :param start: The time.monotonic() the ack times are relative to,
+                      now by default.
+        """
+        self._start = start or time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        utils.join_thread(self._thread, self.stop_timeout)
+        self.engine.dispose()
+
+    def missing(self, db_url):
+        """Return the acknowledged sequence numbers missing in a database."""
+        engine = utils.init_engine(db_url, connect_args=self.connect_args)
+        try:
+            with engine.connect() as conn:
+                present = set(conn.execute(
+                    text(f"SELECT seq FROM {self.table} "
+                         f"WHERE writer = :writer"),
+                    {'writer': self.name}).scalars())
+        finally:
+            engine.dispose()
+        return sorted(seq for seq, _ in self.acked if seq not in present)